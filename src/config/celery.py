@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import celeryd_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
@@ -14,6 +15,26 @@ app.autodiscover_tasks()
 def debug_task(self):
     print(f'Request: {self.request!r}')
 
+
+@celeryd_init.connect
+def configure_queue_concurrency(conf=None, options=None, **kwargs):
+    """
+    Define a concorrência do worker a partir das filas que ele atende (-Q),
+    usando WORKER_QUEUE_CONCURRENCY, quando -c não é informado
+    """
+    from django.conf import settings
+
+    if not options or options.get('concurrency'):
+        return
+
+    queues = options.get('queues') or []
+    if isinstance(queues, str):
+        queues = queues.split(',')
+
+    concurrency = sum(settings.WORKER_QUEUE_CONCURRENCY.get(queue, 0) for queue in queues)
+    if concurrency:
+        conf.worker_concurrency = concurrency
+
 from celery.schedules import crontab
 
 app.conf.beat_schedule = {
@@ -23,7 +44,19 @@ app.conf.beat_schedule = {
     },
     'send-assignment-alerts': {
         'task': 'notifications.send_assignment_alerts',
-        'schedule': crontab(hour=8, minute=0),  # Executa 8:00 AM
+        # Executa 6:00 AM: grava os alertas do dia na fila, cada um disponível
+        # no horário do usuário dentro da janela ALERT_DELIVERY_WINDOW_START-END
+        # (manter igual a notifications.alerts.ALERT_SWEEP_TIME)
+        'schedule': crontab(hour=6, minute=0),
+    },
+    'roll-next-due-dates': {
+        'task': 'core.roll_next_due_dates',
+        # Logo após a virada do dia: a próxima entrega das disciplinas avança
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'drain-email-outbox': {
+        'task': 'notifications.drain_email_outbox',
+        'schedule': 60.0,  # Reenvia tentativas agendadas
     },
 }
 app.conf.timezone = 'UTC'
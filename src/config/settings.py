@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
+from kombu import Queue
 
 # Load environment variables
 load_dotenv()
@@ -39,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'user',
     'core',
     'scraping',
@@ -147,6 +150,93 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Resultados ficam no Redis apenas o tempo necessário para a interface consultá-los;
+# o histórico das sincronizações fica na tabela SyncRun
+CELERY_RESULT_EXPIRES = int(os.getenv('CELERY_RESULT_EXPIRES', '3600'))
+
+# Filas Celery: sincronização manual (interativa), sincronização em lote e notificações.
+# A sincronização é um pipeline: o download (fetch) roda nas filas interactive-sync/bulk-sync
+# (pool de threads), o parsing em sync-parse (prefork) e a gravação em sync-persist (threads)
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('interactive-sync'),
+    Queue('bulk-sync'),
+    Queue('sync-parse'),
+    Queue('sync-persist'),
+    Queue('notifications'),
+    Queue('email-outbox'),
+)
+CELERY_TASK_ROUTES = {
+    'scraping.tasks.fetch_user_pages': {'queue': 'bulk-sync'},
+    'scraping.tasks.parse_user_pages': {'queue': 'sync-parse'},
+    'scraping.tasks.persist_user_data': {'queue': 'sync-persist'},
+    'scraping.tasks.scrape_all_users': {'queue': 'bulk-sync'},
+    'scraping.tasks.periodic_scraping': {'queue': 'bulk-sync'},
+    'core.roll_next_due_dates': {'queue': 'sync-persist'},
+    'notifications.drain_email_outbox': {'queue': 'email-outbox'},
+    'notifications.*': {'queue': 'notifications'},
+}
+
+# Prioridades (Redis: 0 é a maior prioridade)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+    'sep': ':',
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+SYNC_PRIORITY_INTERACTIVE = 0
+SYNC_PRIORITY_BULK = 6
+
+# Cada worker reserva apenas uma tarefa por vez, evitando que tarefas longas
+# segurem tarefas interativas na fila local do worker
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Concorrência por fila (aplicada ao worker iniciado com -Q <fila> sem -c)
+WORKER_QUEUE_CONCURRENCY = {
+    'default': int(os.getenv('CELERY_DEFAULT_CONCURRENCY', '2')),
+    'interactive-sync': int(os.getenv('CELERY_INTERACTIVE_SYNC_CONCURRENCY', '8')),
+    'bulk-sync': int(os.getenv('CELERY_BULK_SYNC_CONCURRENCY', '16')),
+    'sync-parse': int(os.getenv('CELERY_SYNC_PARSE_CONCURRENCY', str(os.cpu_count() or 2))),
+    'sync-persist': int(os.getenv('CELERY_SYNC_PERSIST_CONCURRENCY', '4')),
+    'notifications': int(os.getenv('CELERY_NOTIFICATIONS_CONCURRENCY', '2')),
+    'email-outbox': int(os.getenv('CELERY_EMAIL_OUTBOX_CONCURRENCY', '4')),
+}
+
+# Cache (Redis) - compartilhado entre web e workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://redis:6379/1'),
+    }
+}
+
+# Testes usam cache em memória, isolado do Redis
+if 'test' in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Tempo máximo (segundos) das estatísticas por usuário em cache; escritas
+# invalidam antes disso via versão dos dados (core.cache)
+STATS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', '3600'))
+
+# Sincronização UNAERP
+# Tempo máximo (segundos) que o lock de sincronização de um usuário fica ativo
+SCRAPING_SYNC_LOCK_TIMEOUT = int(os.getenv('SCRAPING_SYNC_LOCK_TIMEOUT', '1800'))
+# Intervalo mínimo (segundos) entre uma sincronização bem-sucedida e a próxima
+SCRAPING_SYNC_COOLDOWN = int(os.getenv('SCRAPING_SYNC_COOLDOWN', '300'))
+# Orçamento de tempo (segundos) do crawl de cada sincronização; ao esgotar, as
+# disciplinas concluídas são salvas e as restantes ficam para a próxima execução
+SCRAPING_SYNC_TIME_BUDGET = int(os.getenv('SCRAPING_SYNC_TIME_BUDGET', '300'))
+# Timeout (segundos) de cada requisição HTTP ao portal
+SCRAPING_REQUEST_TIMEOUT = int(os.getenv('SCRAPING_REQUEST_TIMEOUT', '20'))
+# Redis usado para publicar o progresso das sincronizações (pub/sub)
+SCRAPING_PROGRESS_REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+# Duração máxima (segundos) de cada conexão SSE de progresso; o navegador reconecta sozinho
+SCRAPING_PROGRESS_STREAM_TIMEOUT = int(os.getenv('SCRAPING_PROGRESS_STREAM_TIMEOUT', '600'))
 
 # Email Configuration (MailHog for development)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -157,4 +247,25 @@ EMAIL_USE_SSL = bool(int(os.getenv('EMAIL_USE_SSL', '0')))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@unatrack.com')
+# Alertas enviados por conexão SMTP antes de reconectar
+ALERT_EMAIL_BATCH_SIZE = int(os.getenv('ALERT_EMAIL_BATCH_SIZE', '50'))
+# Usuários por subtarefa no envio diário de alertas
+ALERT_CHUNK_SIZE = int(os.getenv('ALERT_CHUNK_SIZE', '200'))
+
+# Janela de envio dos alertas (HH:MM, no TIME_ZONE): usuários sem horário preferido
+# recebem em um horário fixo dentro dela, espalhando a carga ao longo da manhã
+ALERT_DELIVERY_WINDOW_START = os.getenv('ALERT_DELIVERY_WINDOW_START', '07:00')
+ALERT_DELIVERY_WINDOW_END = os.getenv('ALERT_DELIVERY_WINDOW_END', '10:00')
+# Limite global de e-mails enviados por minuto (0 desativa)
+ALERT_SEND_RATE_PER_MINUTE = int(os.getenv('ALERT_SEND_RATE_PER_MINUTE', '120'))
+
+# Fila de e-mails (EmailOutbox)
+# Tarefas de envio disparadas em paralelo após gravar os alertas do dia
+ALERT_OUTBOX_WORKERS = int(os.getenv('ALERT_OUTBOX_WORKERS', '4'))
+# Tempo máximo (segundos) de cada tarefa de envio antes de liberar o worker
+ALERT_OUTBOX_DRAIN_TIME = int(os.getenv('ALERT_OUTBOX_DRAIN_TIME', '240'))
+# Tentativas de envio de uma mensagem antes de marcá-la como falha
+ALERT_OUTBOX_MAX_ATTEMPTS = int(os.getenv('ALERT_OUTBOX_MAX_ATTEMPTS', '5'))
+# Tempo (segundos) após o qual uma mensagem presa em envio volta para a fila
+ALERT_OUTBOX_LOCK_TIMEOUT = int(os.getenv('ALERT_OUTBOX_LOCK_TIMEOUT', '600'))
 
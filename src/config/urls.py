@@ -29,4 +29,5 @@ urlpatterns = [
     path('dashboard/', include('user.urls')),
     path('user/', include('user.urls')),
     path('scraping/', include('scraping.urls')),
+    path('api/', include('core.urls')),
 ]
@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, F, Q
+from django.db.models.functions import JSONObject
+from django.utils import timezone
+
+from .cache import cached_stats
+from .models import Assignment
+
+VIEW_MONTH = 'month'
+VIEW_WEEK = 'week'
+
+# Maior intervalo (dias) aceito em uma consulta de calendário
+MAX_RANGE_DAYS = 62
+
+
+def calendar_range(view=VIEW_MONTH, anchor=None):
+    """
+    Intervalo exibido no calendário, em semanas completas (segunda a domingo)
+
+    Args:
+        view (str): 'month' (mês de anchor) ou 'week' (semana de anchor)
+        anchor (date): Data de referência (padrão: hoje)
+
+    Returns:
+        Tuple[date, date]: (início, fim), inclusivos
+    """
+    anchor = anchor or timezone.localdate()
+
+    if view == VIEW_WEEK:
+        start = anchor - timedelta(days=anchor.weekday())
+        return start, start + timedelta(days=6)
+
+    first = anchor.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    last = next_month - timedelta(days=1)
+    return first - timedelta(days=first.weekday()), last + timedelta(days=6 - last.weekday())
+
+
+def adjacent_anchors(view, anchor):
+    """
+    Datas de referência do período anterior e do seguinte
+
+    Returns:
+        Tuple[date, date]: (anterior, seguinte)
+    """
+    if view == VIEW_WEEK:
+        return anchor - timedelta(days=7), anchor + timedelta(days=7)
+
+    first = anchor.replace(day=1)
+    return (first - timedelta(days=1)).replace(day=1), (first + timedelta(days=32)).replace(day=1)
+
+
+def day_buckets(user, start, end, course_id=None):
+    """
+    Atividades do intervalo agrupadas por dia, em uma única consulta
+
+    O agrupamento e a montagem da lista de atividades de cada dia são feitos
+    no banco (GROUP BY due_date com ARRAY_AGG), sobre uma varredura de
+    intervalo no índice (user, due_date, id).
+
+    Args:
+        user (CustomUser): Dono das atividades
+        start (date): Primeiro dia
+        end (date): Último dia
+        course_id (int): Restringe a uma disciplina
+
+    Returns:
+        List[Dict]: Um item por dia do intervalo (inclusive dias vazios), com
+            date, total, pending e assignments (id, title, course, completed)
+    """
+    assignments = Assignment.objects.filter(user=user, due_date__range=(start, end))
+    if course_id:
+        assignments = assignments.filter(course_id=course_id)
+
+    rows = assignments.order_by().values('due_date').annotate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(completed=False)),
+        assignments=ArrayAgg(
+            JSONObject(id='id', title='title', course=F('course__name'), completed='completed'),
+            ordering=('completed', 'title', 'id'),
+        ),
+    )
+    by_day = {row['due_date']: row for row in rows}
+
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        row = by_day.get(day)
+        days.append({
+            'date': day,
+            'total': row['total'] if row else 0,
+            'pending': row['pending'] if row else 0,
+            'assignments': row['assignments'] if row else [],
+        })
+
+    return days
+
+
+def cached_day_buckets(user, start, end, course_id=None):
+    """
+    day_buckets em cache por (usuário, intervalo, disciplina, versão dos dados)
+
+    Navegar entre meses já visitados não consulta o banco até a próxima escrita.
+    """
+    return cached_stats(
+        f'calendar:{start.isoformat()}:{end.isoformat()}:{course_id or "all"}',
+        user.id,
+        lambda: day_buckets(user, start, end, course_id=course_id),
+    )
+
+
+def parse_calendar_params(params):
+    """
+    Visão, data de referência e intervalo a partir dos parâmetros da requisição
+
+    Aceita view (month/week) e date (AAAA-MM-DD), ou start e end explícitos,
+    limitados a MAX_RANGE_DAYS. Valores inválidos caem no padrão (mês atual).
+
+    Args:
+        params (QueryDict): request.GET
+
+    Returns:
+        Dict: view, anchor, start e end
+    """
+    view = VIEW_WEEK if params.get('view') == VIEW_WEEK else VIEW_MONTH
+
+    try:
+        anchor = date.fromisoformat(params.get('date', ''))
+    except ValueError:
+        anchor = timezone.localdate()
+
+    start, end = calendar_range(view, anchor)
+
+    try:
+        explicit_start = date.fromisoformat(params.get('start', ''))
+        explicit_end = date.fromisoformat(params.get('end', ''))
+    except ValueError:
+        pass
+    else:
+        if explicit_start <= explicit_end:
+            start, end = explicit_start, min(explicit_end, explicit_start + timedelta(days=MAX_RANGE_DAYS - 1))
+
+    return {'view': view, 'anchor': anchor, 'start': start, 'end': end}
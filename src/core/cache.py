@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+DATA_VERSION_KEY = 'core:data-version:{user_id}'
+STATS_KEY = 'core:stats:{name}:{user_id}:v{version}:{today}'
+
+
+def data_version(user_id):
+    """
+    Versão atual dos dados acadêmicos (disciplinas e atividades) do usuário
+
+    Toda escrita chama bump_data_version, então entradas de cache que embutem a
+    versão ficam obsoletas sem precisar apagá-las uma a uma. Quando a chave não
+    existe (primeiro acesso ou expulsa do Redis), começa de um valor baseado no
+    relógio, que nunca repete versões antigas.
+
+    Args:
+        user_id (int): ID do usuário
+
+    Returns:
+        int: Versão
+    """
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_data_version(user_id):
+    """
+    Invalida os caches derivados dos dados do usuário
+
+    Args:
+        user_id (int): ID do usuário
+    """
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns() // 1000, timeout=None)
+
+
+def cached_stats(name, user_id, compute, today=None):
+    """
+    Estatísticas do usuário em cache, por versão dos dados e por dia
+
+    A data faz parte da chave: na virada do dia as faixas "atrasadas" e
+    "próximas" são recalculadas mesmo sem nenhuma escrita.
+
+    Args:
+        name (str): Nome do conjunto de estatísticas (inclui filtros)
+        user_id (int): ID do usuário
+        compute (callable): Calcula as estatísticas quando não estão em cache
+        today (date): Data de referência (padrão: hoje)
+
+    Returns:
+        Dict: Estatísticas
+    """
+    today = today or timezone.localdate()
+    key = STATS_KEY.format(
+        name=name,
+        user_id=user_id,
+        version=data_version(user_id),
+        today=today.isoformat(),
+    )
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute()
+        cache.set(key, stats, timeout=settings.STATS_CACHE_TIMEOUT)
+
+    return stats
+
+
+def fragment_cache_context(user_id, today=None):
+    """
+    Variáveis de contexto para os blocos {% cache %} das listas nos templates
+
+    Os blocos usam a versão dos dados na chave, então sincronizações e
+    alterações de atividades invalidam o HTML em cache sem apagá-lo; a data
+    entra na chave dos blocos cujo conteúdo depende de hoje (atrasadas, hoje).
+
+    Args:
+        user_id (int): ID do usuário
+        today (date): Data de referência (padrão: hoje)
+
+    Returns:
+        Dict: data_version, cache_today e fragment_cache_timeout
+    """
+    today = today or timezone.localdate()
+    return {
+        'data_version': data_version(user_id),
+        'cache_today': today.isoformat(),
+        'fragment_cache_timeout': settings.STATS_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,96 @@
+from django.db import connection, transaction
+
+from .counters import refresh_course_counters
+from .models import Assignment, Course
+
+ASSIGNMENT_TABLE = Assignment._meta.db_table
+COURSE_TABLE = Course._meta.db_table
+
+
+def toggle_completion(user_id, assignment_id):
+    """
+    Inverte o status de conclusão de uma atividade em um único UPDATE atômico
+
+    A inversão acontece no próprio banco (completed = NOT completed), então
+    cliques duplos concorrentes são serializados pela trava da linha e cada um
+    vê o valor gravado pelo anterior. Os contadores da disciplina são
+    recalculados na mesma transação.
+
+    Args:
+        user_id (int): Dono da atividade
+        assignment_id (int): Atividade
+
+    Returns:
+        bool: Novo status, ou None se a atividade não existe ou não pertence ao usuário
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {ASSIGNMENT_TABLE}
+                SET completed = NOT completed
+                WHERE id = %s
+                  AND course_id IN (SELECT id FROM {COURSE_TABLE} WHERE user_id = %s)
+                RETURNING completed, course_id
+                """,
+                [assignment_id, user_id],
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        completed, course_id = row
+        refresh_course_counters([course_id])
+
+    return completed
+
+
+def complete_assignments(user_id, assignment_ids=None, course_id=None):
+    """
+    Marca várias atividades como concluídas em um único UPDATE
+
+    Apenas atividades ainda pendentes são alteradas; ids de outros usuários são
+    ignorados. Os contadores das disciplinas afetadas são recalculados na mesma
+    transação.
+
+    Args:
+        user_id (int): Dono das atividades
+        assignment_ids (List[int]): Atividades a concluir
+        course_id (int): Conclui todas as atividades da disciplina
+
+    Returns:
+        int: Atividades alteradas
+    """
+    if assignment_ids is None and course_id is None:
+        raise ValueError('Informe assignment_ids ou course_id')
+
+    conditions = ['completed = FALSE', f'course_id IN (SELECT id FROM {COURSE_TABLE} WHERE user_id = %s)']
+    params = [user_id]
+
+    if assignment_ids is not None:
+        if not assignment_ids:
+            return 0
+        conditions.append('id = ANY(%s)')
+        params.append(list(assignment_ids))
+
+    if course_id is not None:
+        conditions.append('course_id = %s')
+        params.append(course_id)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {ASSIGNMENT_TABLE}
+                SET completed = TRUE
+                WHERE {' AND '.join(conditions)}
+                RETURNING course_id
+                """,
+                params,
+            )
+            course_ids = [row[0] for row in cursor.fetchall()]
+
+        refresh_course_counters(course_ids)
+
+    return len(course_ids)
@@ -0,0 +1,118 @@
+from django.db import transaction
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .models import Assignment, Course
+
+
+def counter_expressions(today=None):
+    """
+    Subconsultas que calculam os contadores de uma disciplina a partir de Assignment
+
+    next_due_date considera apenas prazos a partir de hoje: atividades pendentes
+    já vencidas (comuns no histórico importado) não são a próxima entrega.
+
+    Args:
+        today (date): Data de referência (padrão: hoje)
+
+    Returns:
+        Dict: Expressões para total_assignments, pending_assignments e next_due_date
+    """
+    assignments = Assignment.objects.filter(course=OuterRef('pk')).order_by().values('course')
+    pending = assignments.filter(completed=False)
+    today = today or timezone.localdate()
+
+    return {
+        'total_assignments': Coalesce(
+            Subquery(assignments.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            Value(0),
+        ),
+        'pending_assignments': Coalesce(
+            Subquery(pending.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            Value(0),
+        ),
+        'next_due_date': Subquery(
+            pending.filter(due_date__gte=today).annotate(next_due=Min('due_date')).values('next_due')
+        ),
+    }
+
+
+def refresh_course_counters(course_ids):
+    """
+    Recalcula os contadores das disciplinas em um único UPDATE
+
+    Deve ser chamada na mesma transação que alterou as atividades. As linhas
+    das disciplinas são travadas antes do recálculo, então escritas
+    concorrentes na mesma disciplina não deixam contadores desatualizados.
+
+    Args:
+        course_ids (Iterable[int]): Disciplinas afetadas
+
+    Returns:
+        int: Disciplinas atualizadas
+    """
+    course_ids = sorted(set(course_ids))
+    if not course_ids:
+        return 0
+
+    with transaction.atomic():
+        locked_ids = list(
+            Course.objects.select_for_update().filter(id__in=course_ids).order_by('id').values_list('id', flat=True)
+        )
+        return Course.objects.filter(id__in=locked_ids).update(**counter_expressions())
+
+
+def roll_next_due_dates(today=None):
+    """
+    Recalcula as disciplinas cuja próxima entrega já passou
+
+    next_due_date só muda quando alguma atividade é gravada; sem esta
+    atualização diária, o prazo de ontem continuaria como próxima entrega.
+
+    Args:
+        today (date): Data de referência (padrão: hoje)
+
+    Returns:
+        int: Disciplinas atualizadas
+    """
+    today = today or timezone.localdate()
+    stale = list(Course.objects.filter(next_due_date__lt=today).values_list('id', 'user_id'))
+    if not stale:
+        return 0
+
+    updated = refresh_course_counters(course_id for course_id, _ in stale)
+    for user_id in {user_id for _, user_id in stale}:
+        bump_data_version(user_id)
+
+    return updated
+
+
+def find_counter_drift(courses=None):
+    """
+    Disciplinas cujos contadores diferem dos valores reais
+
+    Args:
+        courses (QuerySet): Disciplinas a verificar (padrão: todas)
+
+    Returns:
+        List[Dict]: id, usuário, nome e valores gravados x reais das disciplinas divergentes
+    """
+    courses = courses if courses is not None else Course.objects.all()
+    expressions = counter_expressions()
+
+    rows = courses.annotate(
+        actual_total=expressions['total_assignments'],
+        actual_pending=expressions['pending_assignments'],
+        actual_next_due=expressions['next_due_date'],
+    ).values(
+        'id', 'user_id', 'name', 'total_assignments', 'pending_assignments', 'next_due_date',
+        'actual_total', 'actual_pending', 'actual_next_due',
+    ).order_by('id')
+
+    return [
+        row for row in rows.iterator()
+        if (row['total_assignments'], row['pending_assignments'], row['next_due_date'])
+        != (row['actual_total'], row['actual_pending'], row['actual_next_due'])
+    ]
@@ -0,0 +1,194 @@
+import csv
+from datetime import timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils import timezone
+
+from .models import Assignment
+
+# Linhas lidas do banco por vez e linhas acumuladas por pedaço da resposta
+EXPORT_CHUNK_SIZE = 2000
+LINES_PER_CHUNK = 500
+
+ICS_TOKEN_SALT = 'core.export.ics-feed'
+
+CSV_HEADER = ['Disciplina', 'Atividade', 'Data de Entrega', 'Concluída']
+
+
+class _Echo:
+    """Pseudo-arquivo: csv.writer devolve a linha formatada em vez de gravá-la"""
+
+    def write(self, value):
+        return value
+
+
+def ics_token(user):
+    """
+    Token assinado que identifica o usuário na URL do feed .ics
+
+    Calendários externos não enviam cookies de sessão, então o feed é
+    autenticado pelo token na própria URL. O token inclui ics_feed_version:
+    gerar um novo link (incrementando a versão) revoga os anteriores.
+
+    Args:
+        user (CustomUser): Dono do feed
+
+    Returns:
+        str: Token
+    """
+    return signing.Signer(salt=ICS_TOKEN_SALT).sign(f'{user.id}:{user.ics_feed_version}')
+
+
+def user_id_from_ics_token(token):
+    """
+    Args:
+        token (str): Token gerado por ics_token
+
+    Returns:
+        int: ID do usuário, ou None se a assinatura for inválida ou o link foi revogado
+    """
+    try:
+        user_id, version = (int(part) for part in signing.Signer(salt=ICS_TOKEN_SALT).unsign(token).split(':'))
+    except (signing.BadSignature, ValueError):
+        return None
+
+    if not get_user_model().objects.filter(id=user_id, ics_feed_version=version, is_active=True).exists():
+        return None
+    return user_id
+
+
+def rotate_ics_token(user):
+    """
+    Gera um novo link do feed .ics, invalidando os anteriores
+
+    Args:
+        user (CustomUser): Dono do feed
+    """
+    user.ics_feed_version += 1
+    user.save(update_fields=['ics_feed_version'])
+
+
+def assignment_rows(user_id, with_due_only=False):
+    """
+    Atividades do usuário para exportação, como tuplas e ordenadas por prazo
+
+    Returns:
+        QuerySet: (id, course__name, title, due_date, completed, last_checked_at)
+    """
+    assignments = Assignment.objects.filter(user_id=user_id)
+    if with_due_only:
+        assignments = assignments.filter(due_date__isnull=False)
+
+    return assignments.order_by('due_date', 'id').values_list(
+        'id', 'course__name', 'title', 'due_date', 'completed', 'last_checked_at',
+    )
+
+
+async def stream_csv(user_id):
+    """
+    CSV das atividades, em pedaços, lido do banco com cursor no servidor
+
+    A memória usada não depende da quantidade de atividades.
+
+    Args:
+        user_id (int): ID do usuário
+
+    Yields:
+        str: Pedaços do arquivo CSV
+    """
+    writer = csv.writer(_Echo())
+    lines = [writer.writerow(CSV_HEADER)]
+
+    async for _, course_name, title, due_date, completed, _ in assignment_rows(user_id).aiterator(
+        chunk_size=EXPORT_CHUNK_SIZE,
+    ):
+        lines.append(writer.writerow([
+            course_name,
+            title,
+            due_date.strftime('%d/%m/%Y') if due_date else '',
+            'Sim' if completed else 'Não',
+        ]))
+
+        if len(lines) >= LINES_PER_CHUNK:
+            yield ''.join(lines)
+            lines = []
+
+    if lines:
+        yield ''.join(lines)
+
+
+async def stream_ics(user_id):
+    """
+    Calendário iCalendar (RFC 5545) com as atividades que têm prazo
+
+    Cada atividade vira um evento de dia inteiro na data de entrega.
+
+    Args:
+        user_id (int): ID do usuário
+
+    Yields:
+        str: Pedaços do arquivo .ics
+    """
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//UnaTrack//Atividades//PT',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:UnaTrack - Atividades',
+    ]
+
+    async for assignment_id, course_name, title, due_date, completed, last_checked_at in assignment_rows(
+        user_id, with_due_only=True,
+    ).aiterator(chunk_size=EXPORT_CHUNK_SIZE):
+        stamp = (last_checked_at or timezone.now()).astimezone(dt_timezone.utc)
+        summary = f'{"[Concluída] " if completed else ""}{title}'
+
+        lines.extend([
+            'BEGIN:VEVENT',
+            f'UID:assignment-{assignment_id}@unatrack',
+            f'DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}',
+            f'DTSTART;VALUE=DATE:{due_date:%Y%m%d}',
+            f'DTEND;VALUE=DATE:{due_date + timedelta(days=1):%Y%m%d}',
+            _fold(f'SUMMARY:{_escape(summary)}'),
+            _fold(f'DESCRIPTION:{_escape(course_name)}'),
+            'TRANSP:TRANSPARENT',
+            'END:VEVENT',
+        ])
+
+        if len(lines) >= LINES_PER_CHUNK:
+            yield ''.join(f'{line}\r\n' for line in lines)
+            lines = []
+
+    lines.append('END:VCALENDAR')
+    yield ''.join(f'{line}\r\n' for line in lines)
+
+
+def _escape(text):
+    """Escapa um valor de texto do iCalendar"""
+    return (
+        text.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line, limit=75):
+    """Quebra linhas com mais de 75 octetos, como exige o iCalendar"""
+    if len(line.encode('utf-8')) <= limit:
+        return line
+
+    parts = []
+    current = ''
+    for char in line:
+        # Linhas de continuação começam com um espaço, que conta no limite
+        if len((current + char).encode('utf-8')) > (limit if not parts else limit - 1):
+            parts.append(current)
+            current = ''
+        current += char
+    parts.append(current)
+
+    return '\r\n '.join(parts)
@@ -0,0 +1,14 @@
+from django.db.models import Func, TextField
+
+
+class ImmutableUnaccent(Func):
+    """
+    unaccent() do Postgres em uma função IMMUTABLE (criada na migração 0006)
+
+    O unaccent() original é apenas STABLE e não pode ser usado em índices;
+    este wrapper permite indexar o texto sem acentos e usar o mesmo índice
+    nas buscas.
+    """
+
+    function = 'immutable_unaccent'
+    output_field = TextField()
@@ -0,0 +1,157 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from core.models import Assignment, Course
+from core.scratch import create_users, scratch_database
+from core.search import matching_assignments, search_assignments
+
+COURSE_NAMES = [
+    'Cálculo I', 'Álgebra Linear', 'Física Experimental', 'Programação Orientada a Objetos',
+    'Estruturas de Dados', 'Banco de Dados', 'Engenharia de Software', 'Redes de Computadores',
+    'Sistemas Operacionais', 'Ética e Cidadania', 'Comunicação e Expressão', 'Estatística Aplicada',
+]
+
+QUERIES = [
+    'Questionário Unidade 3',
+    'questionario unidade 3',
+    'forum semana 12',
+    'tarfea avaliativa',
+    'calculo',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a busca de atividades (trigramas + índices GIN) com icontains em um banco '
+        'temporário com milhões de atividades. O usuário do banco precisa de permissão CREATEDB.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=2000,
+            help='Quantidade de usuários sintéticos',
+        )
+        parser.add_argument(
+            '--courses-per-user',
+            type=int,
+            default=10,
+            help='Disciplinas por usuário',
+        )
+        parser.add_argument(
+            '--assignments-per-course',
+            type=int,
+            default=100,
+            help='Atividades por disciplina (padrão: 2 milhões de atividades no total)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Execuções de cada busca (o relatório usa a mediana)',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Mostra o plano completo da busca',
+        )
+
+    def handle(self, *args, **options):
+        with scratch_database() as name:
+            self.stdout.write(self.style.SUCCESS(f'Banco temporário criado: {name}'))
+            self._run(options)
+        self.stdout.write('Banco temporário removido')
+
+    def _run(self, options):
+        users = max(options['users'], 1)
+        courses_per_user = max(options['courses_per_user'], 1)
+        per_course = max(options['assignments_per_course'], 1)
+        repeat = max(options['repeat'], 1)
+
+        start = time.perf_counter()
+        user = self._seed(users, courses_per_user, per_course)
+        total = Assignment.objects.count()
+        self.stdout.write(f'   {total} atividades criadas em {time.perf_counter() - start:.1f}s')
+
+        self.stdout.write('\n' + '='*50)
+        for query in QUERIES:
+            baseline = Assignment.objects.filter(user=user).filter(
+                Q(title__icontains=query) | Q(course__name__icontains=query)
+            ).select_related('course')[:50]
+
+            baseline_ms, baseline_results = self._timed(lambda: list(baseline.all()), repeat)
+            search_ms, search_results = self._timed(lambda: search_assignments(user, query), repeat)
+
+            self.stdout.write(f'   "{query}"')
+            self.stdout.write(f'      icontains: {baseline_ms:.1f} ms, {len(baseline_results)} resultados')
+            self.stdout.write(f'      trigramas: {search_ms:.1f} ms, {len(search_results)} resultados')
+            if search_results:
+                best = search_results[0]
+                self.stdout.write(f'      melhor: {best.title} ({best.course.name}, rank {best.rank:.2f})')
+
+        # Plano da consulta que a busca realmente executa (com o filtro de usuário)
+        plan = matching_assignments(user, QUERIES[0]).explain()
+        index_used = 'assignment_title_trgm_idx' in plan
+        style = self.style.SUCCESS if index_used else self.style.WARNING
+        self.stdout.write(style(
+            f'   Índice de trigramas {"usado" if index_used else "não usado"} na busca do usuário'
+        ))
+        if options['verbose_plans'] or not index_used:
+            self.stdout.write(plan)
+
+    def _seed(self, users, courses_per_user, per_course):
+        """
+        Cria usuários e disciplinas com bulk_create e as atividades com um
+        único INSERT ... SELECT generate_series, bem mais rápido para milhões de linhas
+
+        Returns:
+            CustomUser: Usuário usado nas buscas
+        """
+        created_users = create_users('search', users, last_name='Busca', batch_size=2000)
+
+        Course.objects.bulk_create([
+            Course(user=user, name=self._course_name(n), instructor='Professor')
+            for user in created_users
+            for n in range(courses_per_user)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Assignment._meta.db_table}
+                    (title, due_date, completed, alert_sent, last_checked_at, course_id, user_id)
+                SELECT
+                    (ARRAY['Questionário', 'Tarefa', 'Fórum', 'Atividade Avaliativa', 'Exercícios'])[1 + n %% 5]
+                        || ' Unidade ' || (1 + n %% 8) || ' - Semana ' || n,
+                    CURRENT_DATE + ((n * 7 + c.id) %% 365 - 180),
+                    n %% 3 = 0,
+                    n %% 3 = 0,
+                    NOW(),
+                    c.id,
+                    c.user_id
+                FROM {Course._meta.db_table} c
+                CROSS JOIN generate_series(1, %s) AS n
+                """,
+                [per_course],
+            )
+            cursor.execute('ANALYZE')
+
+        return created_users[len(created_users) // 2]
+
+    def _course_name(self, n):
+        """Nome da n-ésima disciplina de um usuário (único por usuário)"""
+        name = COURSE_NAMES[n % len(COURSE_NAMES)]
+        return name if n < len(COURSE_NAMES) else f'{name} {n // len(COURSE_NAMES) + 1}'
+
+    def _timed(self, func, repeat):
+        """Mediana (ms) de repeat execuções e o resultado da última"""
+        timings = []
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), result
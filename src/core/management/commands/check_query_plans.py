@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.query_plans import query_plan_checks, seed_assignment_history
+from core.scratch import scratch_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria um banco temporário com dados sintéticos e verifica, via EXPLAIN, se as consultas '
+        'críticas usam os índices esperados. O usuário do banco precisa de permissão CREATEDB. '
+        'A mesma verificação roda em manage.py test core.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=300,
+            help='Quantidade de usuários sintéticos',
+        )
+        parser.add_argument(
+            '--assignments-per-user',
+            type=int,
+            default=150,
+            help='Atividades (histórico + pendentes) por usuário',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Mostra o plano completo de cada consulta',
+        )
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            failures = self._run(options)
+
+        if failures:
+            raise CommandError(f'{failures} consultas não usam os índices esperados')
+
+        self.stdout.write(self.style.SUCCESS('Todas as consultas usam os índices esperados'))
+
+    def _run(self, options):
+        today = timezone.now().date()
+        user, course = seed_assignment_history(
+            max(options['users'], 1), max(options['assignments_per_user'], 10), today,
+        )
+
+        failures = 0
+        for label, queryset, index_name in query_plan_checks(user, course, today):
+            plan = queryset.explain()
+
+            if index_name in plan:
+                self.stdout.write(self.style.SUCCESS(f'  OK    {label}: {index_name}'))
+            else:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'  FALHA {label}: {index_name} não aparece no plano'))
+
+            if options['verbose_plans'] or index_name not in plan:
+                for line in plan.splitlines():
+                    self.stdout.write(f'          {line}')
+
+        return failures
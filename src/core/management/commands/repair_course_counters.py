@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from core.cache import bump_data_version
+from core.counters import find_counter_drift, refresh_course_counters
+from core.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Verifica e corrige os contadores de atividades das disciplinas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra as divergências, sem corrigir',
+        )
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Verifica apenas as disciplinas de um usuário',
+        )
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options.get('user_id'):
+            courses = courses.filter(user_id=options['user_id'])
+
+        drift = find_counter_drift(courses)
+
+        for row in drift:
+            self.stdout.write(
+                self.style.WARNING(f'  {row["name"]} (ID {row["id"]}): ')
+                + f'total {row["total_assignments"]} -> {row["actual_total"]}, '
+                f'pendentes {row["pending_assignments"]} -> {row["actual_pending"]}, '
+                f'próxima entrega {row["next_due_date"]} -> {row["actual_next_due"]}'
+            )
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Contadores consistentes'))
+            return
+
+        if options.get('dry_run'):
+            self.stdout.write(self.style.WARNING(f'DRY RUN: {len(drift)} disciplinas seriam corrigidas'))
+            return
+
+        repaired = refresh_course_counters(row['id'] for row in drift)
+
+        # Fragmentos de template e estatísticas em cache ainda têm os contadores antigos
+        for user_id in {row['user_id'] for row in drift}:
+            bump_data_version(user_id)
+
+        self.stdout.write(self.style.SUCCESS(f'{repaired} disciplinas corrigidas'))
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:30
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_course_counters(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    Assignment = apps.get_model('core', 'Assignment')
+
+    assignments = Assignment.objects.filter(course=OuterRef('pk')).order_by().values('course')
+    pending = assignments.filter(completed=False)
+
+    Course.objects.update(
+        total_assignments=Coalesce(
+            Subquery(assignments.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            Value(0),
+        ),
+        pending_assignments=Coalesce(
+            Subquery(pending.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            Value(0),
+        ),
+        next_due_date=Subquery(
+            pending.filter(due_date__isnull=False).annotate(next_due=Min('due_date')).values('next_due')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_assignment_due_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='total_assignments',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total de Atividades'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='pending_assignments',
+            field=models.PositiveIntegerField(default=0, verbose_name='Atividades Pendentes'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='next_due_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Próxima Entrega'),
+        ),
+        migrations.RunPython(fill_course_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_course_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(condition=models.Q(('alert_sent', False), ('completed', False), ('due_date__isnull', False)), fields=['due_date', 'user'], name='assignment_alert_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['user', 'due_date'], name='assignment_user_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['user', '-due_date', '-id'], name='assignment_user_due_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['course', '-due_date', '-id'], name='assignment_course_due_id_idx'),
+        ),
+    ]
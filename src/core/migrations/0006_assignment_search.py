@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-19 15:20
+
+import core.functions
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_assignment_indexes'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        TrigramExtension(),
+        # unaccent() é STABLE; índices exigem uma função IMMUTABLE
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+                AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+            """,
+            reverse_sql='DROP FUNCTION IF EXISTS immutable_unaccent(text);',
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(core.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('title')), name='gin_trgm_ops'), name='assignment_title_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(core.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('name')), name='gin_trgm_ops'), name='course_name_trgm_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Lower
 from django.conf import settings
+from ..functions import ImmutableUnaccent
 from .courses import Course
 
 
@@ -16,6 +19,28 @@ class Assignment(models.Model):
 
     class Meta:
         unique_together = ['title', 'course', 'due_date']
+        indexes = [
+            # Seleção diária de alertas: pendentes, sem alerta enviado, por data de entrega
+            models.Index(
+                fields=['due_date', 'user'],
+                condition=models.Q(completed=False, alert_sent=False, due_date__isnull=False),
+                name='assignment_alert_pending_idx',
+            ),
+            # Contagens de atrasadas/próximas por usuário
+            models.Index(
+                fields=['user', 'due_date'],
+                condition=models.Q(completed=False),
+                name='assignment_user_pending_idx',
+            ),
+            # Listagens paginadas por keyset (due_date, id), geral e por disciplina
+            models.Index(fields=['user', '-due_date', '-id'], name='assignment_user_due_id_idx'),
+            models.Index(fields=['course', '-due_date', '-id'], name='assignment_course_due_id_idx'),
+            # Busca por título (trigramas, sem acentos e sem diferenciar maiúsculas)
+            GinIndex(
+                OpClass(ImmutableUnaccent(Lower('title')), name='gin_trgm_ops'),
+                name='assignment_title_trgm_idx',
+            ),
+        ]
         verbose_name = 'Atividade'
         verbose_name_plural = 'Atividades'
 
@@ -1,5 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Lower
 from django.conf import settings
+from ..functions import ImmutableUnaccent
 
 
 class Course(models.Model):
@@ -9,10 +12,22 @@ class Course(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
 
+    # Contadores mantidos por core.counters.refresh_course_counters a cada escrita em Assignment
+    total_assignments = models.PositiveIntegerField(default=0, verbose_name='Total de Atividades')
+    pending_assignments = models.PositiveIntegerField(default=0, verbose_name='Atividades Pendentes')
+    next_due_date = models.DateField(null=True, blank=True, verbose_name='Próxima Entrega')
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='Usuário')
 
     class Meta:
         unique_together = ('user', 'name')
+        indexes = [
+            # Busca por nome da disciplina (trigramas, sem acentos e sem diferenciar maiúsculas)
+            GinIndex(
+                OpClass(ImmutableUnaccent(Lower('name')), name='gin_trgm_ops'),
+                name='course_name_trgm_idx',
+            ),
+        ]
         verbose_name = 'Disciplina'
         verbose_name_plural = 'Disciplinas'
 
@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.db.models import Q
+
+
+def paginate_by_due_date(queryset, cursor=None, page_size=50):
+    """
+    Página de atividades ordenadas por (due_date, id) decrescente, por keyset
+
+    Em vez de OFFSET, a página seguinte começa logo após a última linha da
+    anterior, então o custo não cresce com o histórico do usuário.
+
+    Args:
+        queryset (QuerySet): Atividades com due_date preenchido
+        cursor (str): Cursor 'AAAA-MM-DD:id' da última linha da página anterior
+        page_size (int): Itens por página
+
+    Returns:
+        Tuple[List, str]: (itens da página, cursor da próxima página ou None)
+    """
+    queryset = queryset.order_by('-due_date', '-id')
+
+    if cursor:
+        try:
+            due_date, pk = cursor.split(':')
+            due_date, pk = date.fromisoformat(due_date), int(pk)
+        except ValueError:
+            pass
+        else:
+            queryset = queryset.filter(Q(due_date__lt=due_date) | Q(due_date=due_date, id__lt=pk))
+
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+
+    last = items[page_size - 1]
+    return items[:page_size], f'{last.due_date.isoformat()}:{last.id}'
+
+
+def paginate_by_id(queryset, cursor=None, page_size=50):
+    """
+    Página ordenada por id decrescente, por keyset
+
+    Args:
+        queryset (QuerySet): Itens a paginar
+        cursor (str): id da última linha da página anterior
+        page_size (int): Itens por página
+
+    Returns:
+        Tuple[List, str]: (itens da página, cursor da próxima página ou None)
+    """
+    queryset = queryset.order_by('-id')
+
+    if cursor:
+        try:
+            queryset = queryset.filter(id__lt=int(cursor))
+        except ValueError:
+            pass
+
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+
+    return items[:page_size], str(items[page_size - 1].id)
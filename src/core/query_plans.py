@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.db import connection
+
+from notifications.alerts import alert_candidates
+from .models import Assignment, Course
+from .scratch import create_users
+
+
+def seed_assignment_history(users, per_user, today):
+    """
+    Histórico realista: a maior parte das atividades já passou, foi concluída
+    e alertada; poucas estão pendentes perto do prazo
+
+    Termina com ANALYZE, para que o planner tenha estatísticas atualizadas.
+
+    Args:
+        users (int): Quantidade de usuários
+        per_user (int): Atividades por usuário (divididas em 5 disciplinas)
+        today (date): Data de referência
+
+    Returns:
+        Tuple[CustomUser, Course]: Usuário e disciplina usados nas consultas
+    """
+    created_users = create_users('plan', users, last_name='Plano')
+
+    courses = Course.objects.bulk_create([
+        Course(user=user, name=f'Disciplina {n}', instructor='Professor')
+        for user in created_users
+        for n in range(5)
+    ], batch_size=2000)
+
+    assignments = []
+    for index, course in enumerate(courses):
+        for n in range(per_user // 5):
+            pending = n < 3
+            assignments.append(Assignment(
+                user=course.user,
+                course=course,
+                title=f'Atividade {n}',
+                due_date=today + timedelta(days=n) if pending else today - timedelta(days=n + (index % 7)),
+                completed=not pending,
+                alert_sent=not pending,
+            ))
+    Assignment.objects.bulk_create(assignments, batch_size=5000)
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    return created_users[0], courses[0]
+
+
+def query_plan_checks(user, course, today):
+    """
+    Consultas críticas e o índice que cada uma deve usar
+
+    Returns:
+        List[Tuple[str, QuerySet, str]]: (descrição, consulta, nome do índice)
+    """
+    return [
+        (
+            'Seleção de alertas',
+            alert_candidates(today).order_by('user_id', 'due_date', 'id'),
+            'assignment_alert_pending_idx',
+        ),
+        (
+            'Atrasadas do usuário',
+            Assignment.objects.filter(user=user, completed=False, due_date__lt=today),
+            'assignment_user_pending_idx',
+        ),
+        (
+            'Próximas do usuário',
+            Assignment.objects.filter(
+                user=user, completed=False, due_date__gte=today, due_date__lte=today + timedelta(days=7),
+            ),
+            'assignment_user_pending_idx',
+        ),
+        (
+            'Listagem (keyset)',
+            Assignment.objects.filter(user=user, due_date__isnull=False).order_by('-due_date', '-id')[:51],
+            'assignment_user_due_id_idx',
+        ),
+        (
+            'Listagem por disciplina (keyset)',
+            Assignment.objects.filter(user=user, course=course, due_date__isnull=False).order_by('-due_date', '-id')[:51],
+            'assignment_course_due_id_idx',
+        ),
+    ]
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+from user.models import CustomUser
+
+
+@contextmanager
+def scratch_database():
+    """
+    Banco temporário para dados sintéticos de benchmarks e verificações
+
+    É o mesmo banco de testes criado por manage.py test: os dados sintéticos
+    nunca tocam o banco real. O usuário do banco precisa de permissão CREATEDB.
+
+    Yields:
+        str: Nome do banco temporário
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        yield connection.settings_dict['NAME']
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def create_users(prefix, count, last_name, batch_size=1000, **fields):
+    """
+    Cria usuários sintéticos com bulk_create
+
+    Args:
+        prefix (str): Prefixo do username e do e-mail ({prefix}{i}@example.com)
+        count (int): Quantidade de usuários
+        last_name (str): Sobrenome de todos os usuários
+        batch_size (int): Linhas por INSERT
+        **fields: Demais campos de CustomUser, iguais para todos
+
+    Returns:
+        List[CustomUser]: Usuários criados, com IDs
+    """
+    return CustomUser.objects.bulk_create([
+        CustomUser(
+            username=f'{prefix}{i}',
+            email=f'{prefix}{i}@example.com',
+            first_name=f'Aluno {i}',
+            last_name=last_name,
+            password='!',
+            **fields,
+        )
+        for i in range(count)
+    ], batch_size=batch_size)
@@ -0,0 +1,122 @@
+from datetime import date
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Value
+from django.db.models.functions import Greatest, Lower
+
+from .functions import ImmutableUnaccent
+from .models import Assignment, Course
+
+# Resultados retornados por busca
+SEARCH_RESULTS_LIMIT = 50
+
+# Buscas mais curtas que isso não formam trigramas úteis
+MIN_QUERY_LENGTH = 2
+
+
+def normalized(expression):
+    """Texto em minúsculas e sem acentos, igual à expressão dos índices de busca"""
+    return ImmutableUnaccent(Lower(expression))
+
+
+def matching_assignments(user, query, course_id=None, due_from=None, due_to=None):
+    """
+    IDs das atividades do usuário cujo título ou disciplina combina com a busca
+
+    As duas condições ficam em consultas separadas, unidas com UNION: com um OR
+    entre elas o planner não consegue usar assignment_title_trgm_idx e acaba
+    percorrendo todas as atividades do usuário.
+
+    Args:
+        user (CustomUser): Dono das atividades
+        query (str): Texto buscado (já validado)
+        course_id (int): Restringe a uma disciplina
+        due_from (date): Prazo a partir de
+        due_to (date): Prazo até
+
+    Returns:
+        QuerySet: UNION dos IDs por título e por disciplina
+    """
+    search_query = normalized(Value(query))
+
+    assignments = Assignment.objects.filter(user=user)
+    if course_id:
+        assignments = assignments.filter(course_id=course_id)
+    if due_from:
+        assignments = assignments.filter(due_date__gte=due_from)
+    if due_to:
+        assignments = assignments.filter(due_date__lte=due_to)
+
+    matching_courses = Course.objects.filter(user=user).alias(
+        search_name=normalized('name'),
+    ).filter(search_name__trigram_word_similar=search_query).values('id')
+
+    by_title = assignments.alias(
+        search_title=normalized('title'),
+    ).filter(search_title__trigram_word_similar=search_query).values_list('id', flat=True)
+    by_course = assignments.filter(course_id__in=matching_courses).values_list('id', flat=True)
+
+    return by_title.order_by().union(by_course.order_by())
+
+
+def search_assignments(user, query, course_id=None, due_from=None, due_to=None, limit=SEARCH_RESULTS_LIMIT):
+    """
+    Busca aproximada de atividades pelo título ou pelo nome da disciplina
+
+    Ignora acentos e maiúsculas e tolera erros de digitação: compara trigramas
+    (pg_trgm, operador %>) usando os índices GIN assignment_title_trgm_idx e
+    course_name_trgm_idx. Os resultados vêm ordenados pela similaridade.
+
+    Args:
+        user (CustomUser): Dono das atividades
+        query (str): Texto buscado
+        course_id (int): Restringe a uma disciplina
+        due_from (date): Prazo a partir de
+        due_to (date): Prazo até
+        limit (int): Quantidade máxima de resultados
+
+    Returns:
+        List[Assignment]: Atividades com o atributo rank (0 a 1)
+    """
+    query = (query or '').strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+
+    ids = list(matching_assignments(user, query, course_id=course_id, due_from=due_from, due_to=due_to))
+    if not ids:
+        return []
+
+    search_query = normalized(Value(query))
+
+    return list(
+        Assignment.objects.filter(id__in=ids).select_related('course').annotate(
+            rank=Greatest(
+                TrigramWordSimilarity(search_query, normalized('title')),
+                TrigramWordSimilarity(search_query, normalized('course__name')),
+            ),
+        ).order_by('-rank', 'due_date', 'id')[:limit]
+    )
+
+
+def parse_search_filters(params):
+    """
+    Filtros de busca a partir dos parâmetros da requisição (course, due_from, due_to)
+
+    Valores inválidos são ignorados.
+
+    Args:
+        params (QueryDict): request.GET
+
+    Returns:
+        Dict: course_id, due_from e due_to, prontos para search_assignments
+    """
+    course = params.get('course', '')
+    filters = {'course_id': int(course) if course.isdigit() else None}
+
+    for name in ('due_from', 'due_to'):
+        try:
+            filters[name] = date.fromisoformat(params.get(name, ''))
+        except ValueError:
+            filters[name] = None
+
+    return filters
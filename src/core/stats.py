@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Assignment, Course
+
+# Janela (dias) considerada "próxima do vencimento" nos painéis
+UPCOMING_DAYS = 7
+
+
+def courses_with_counts(user):
+    """
+    Disciplinas do usuário com o total de atividades, as pendentes e a próxima entrega
+
+    As contagens são colunas de Course mantidas a cada escrita
+    (core.counters), então a listagem lê apenas a tabela de disciplinas.
+
+    Args:
+        user (CustomUser): Dono das disciplinas
+
+    Returns:
+        QuerySet: Disciplinas ordenadas por nome
+    """
+    return Course.objects.filter(user=user).order_by('name')
+
+
+def dashboard_stats(user, today=None):
+    """
+    Totais do dashboard em uma única consulta com agregações condicionais
+
+    Args:
+        user (CustomUser): Usuário
+        today (date): Data de referência (padrão: hoje)
+
+    Returns:
+        Dict: total_courses, total_assignments, pending_assignments,
+            overdue_assignments e upcoming_assignments
+    """
+    today = today or timezone.localdate()
+    pending = Q(assignment__completed=False)
+
+    return Course.objects.filter(user=user).aggregate(
+        total_courses=Count('id', distinct=True),
+        total_assignments=Count('assignment'),
+        pending_assignments=Count('assignment', filter=pending),
+        overdue_assignments=Count('assignment', filter=pending & Q(assignment__due_date__lt=today)),
+        upcoming_assignments=Count(
+            'assignment',
+            filter=pending & Q(
+                assignment__due_date__gte=today,
+                assignment__due_date__lte=today + timedelta(days=UPCOMING_DAYS),
+            ),
+        ),
+    )
+
+
+def assignment_stats(user, today=None, course_id=None):
+    """
+    Estatísticas da página de atividades em uma única consulta
+
+    Args:
+        user (CustomUser): Usuário
+        today (date): Data de referência (padrão: hoje)
+        course_id (int): Restringe a uma disciplina
+
+    Returns:
+        Dict: total, with_due, without_due, pending, overdue e upcoming
+    """
+    today = today or timezone.localdate()
+    pending = Q(completed=False)
+
+    assignments = Assignment.objects.filter(user=user)
+    if course_id:
+        assignments = assignments.filter(course_id=course_id)
+
+    return assignments.aggregate(
+        total=Count('id'),
+        with_due=Count('id', filter=Q(due_date__isnull=False)),
+        without_due=Count('id', filter=Q(due_date__isnull=True)),
+        pending=Count('id', filter=pending),
+        overdue=Count('id', filter=pending & Q(due_date__lt=today)),
+        upcoming=Count(
+            'id',
+            filter=pending & Q(due_date__gte=today, due_date__lte=today + timedelta(days=UPCOMING_DAYS)),
+        ),
+    )
@@ -0,0 +1,16 @@
+from celery import shared_task
+import logging
+
+from .counters import roll_next_due_dates
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='core.roll_next_due_dates', ignore_result=True)
+def roll_course_next_due_dates():
+    """
+    Atualiza diariamente a próxima entrega das disciplinas cujo prazo já passou
+    """
+    updated = roll_next_due_dates()
+    logger.info(f"Próxima entrega recalculada em {updated} disciplinas")
+    return updated
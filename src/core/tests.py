@@ -1,2 +1,52 @@
 from django.test import TestCase
+from django.utils import timezone
 
+from user.models import CustomUser
+from .export import ics_token, rotate_ics_token, user_id_from_ics_token
+from .query_plans import query_plan_checks, seed_assignment_history
+
+
+class QueryPlanTests(TestCase):
+    """
+    As consultas críticas usam os índices esperados (mesma verificação de check_query_plans)
+
+    O histórico sintético é grande o bastante para que o planner prefira os
+    índices a uma varredura sequencial.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.now().date()
+        cls.user, cls.course = seed_assignment_history(users=300, per_user=150, today=cls.today)
+
+    def test_queries_use_expected_indexes(self):
+        for label, queryset, index_name in query_plan_checks(self.user, self.course, self.today):
+            with self.subTest(label):
+                plan = queryset.explain()
+                self.assertIn(index_name, plan, f'{label}: {index_name} não aparece no plano\n{plan}')
+
+
+class IcsTokenTests(TestCase):
+    """Gerar um novo link do feed .ics revoga o anterior"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(
+            username='aluno',
+            email='aluno@example.com',
+            first_name='Aluno',
+            last_name='Teste',
+        )
+
+    def test_token_identifies_user(self):
+        self.assertEqual(user_id_from_ics_token(ics_token(self.user)), self.user.id)
+
+    def test_rotation_revokes_previous_token(self):
+        old_token = ics_token(self.user)
+
+        rotate_ics_token(self.user)
+
+        self.assertIsNone(user_id_from_ics_token(old_token))
+        self.assertEqual(user_id_from_ics_token(ics_token(self.user)), self.user.id)
+
+    def test_tampered_token_is_rejected(self):
+        self.assertIsNone(user_id_from_ics_token(ics_token(self.user) + 'x'))
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('courses/', views.courses_api, name='courses'),
+    path('assignments/', views.assignments_api, name='assignments'),
+    path('stats/', views.stats_api, name='stats'),
+    path('search/', views.search_api, name='search'),
+    path('calendar/', views.calendar_api, name='calendar'),
+    path('export/assignments.csv', views.export_assignments_csv, name='export_csv'),
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+]
@@ -1 +1,181 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from .agenda import cached_day_buckets, parse_calendar_params
+from .cache import cached_stats, data_version
+from .export import stream_csv, stream_ics, user_id_from_ics_token
+from .models import Assignment
+from .pagination import paginate_by_due_date, paginate_by_id
+from .search import parse_search_filters, search_assignments
+from .stats import assignment_stats, courses_with_counts, dashboard_stats
+
+# Atividades por página na API
+API_PAGE_SIZE = 100
+
+
+def data_etag(request, *args, **kwargs):
+    """
+    ETag das respostas da API: versão dos dados do usuário + data de hoje
+
+    A versão muda a cada sincronização ou alteração de atividade
+    (core.cache.bump_data_version) e a data faz as faixas "atrasadas" e
+    "próximas" expirarem na virada do dia. Uma requisição com If-None-Match
+    igual recebe 304 sem consultar disciplinas nem atividades.
+    """
+    return f'{data_version(request.user.id)}-{timezone.localdate().isoformat()}'
+
+
+def api_view(view):
+    """GET autenticado, com revalidação obrigatória por ETag"""
+    view = condition(etag_func=data_etag)(view)
+    view = cache_control(private=True, no_cache=True)(view)
+    return login_required(require_GET(view))
+
+
+@api_view
+def courses_api(request):
+    """Disciplinas do usuário com contadores de atividades"""
+    courses = courses_with_counts(request.user).values(
+        'id', 'name', 'instructor', 'link', 'total_assignments', 'pending_assignments', 'next_due_date',
+    )
+    return JsonResponse({'success': True, 'courses': list(courses)})
+
+
+@api_view
+def assignments_api(request):
+    """
+    Atividades do usuário, paginadas por keyset
+
+    Parâmetros: course (id da disciplina), due=none (apenas sem prazo) e
+    after (cursor retornado em 'next').
+    """
+    assignments = Assignment.objects.filter(user=request.user).select_related('course')
+
+    course_filter = request.GET.get('course', '')
+    if course_filter.isdigit():
+        assignments = assignments.filter(course_id=int(course_filter))
+
+    if request.GET.get('due') == 'none':
+        page, next_cursor = paginate_by_id(
+            assignments.filter(due_date__isnull=True),
+            cursor=request.GET.get('after'),
+            page_size=API_PAGE_SIZE,
+        )
+    else:
+        page, next_cursor = paginate_by_due_date(
+            assignments.filter(due_date__isnull=False),
+            cursor=request.GET.get('after'),
+            page_size=API_PAGE_SIZE,
+        )
+
+    return JsonResponse({
+        'success': True,
+        'assignments': [_serialize_assignment(assignment) for assignment in page],
+        'next': next_cursor,
+    })
+
+
+@api_view
+def stats_api(request):
+    """Totais do dashboard, ou da página de atividades quando há filtro de disciplina"""
+    course_filter = request.GET.get('course', '')
+
+    if course_filter.isdigit():
+        course_id = int(course_filter)
+        stats = cached_stats(
+            f'assignments:{course_id}',
+            request.user.id,
+            lambda: assignment_stats(request.user, course_id=course_id),
+        )
+    else:
+        stats = cached_stats('dashboard', request.user.id, lambda: dashboard_stats(request.user))
+
+    return JsonResponse({'success': True, 'stats': stats})
+
+
+@api_view
+def calendar_api(request):
+    """
+    Atividades por dia em um mês ou semana
+
+    Parâmetros: view (month/week), date (AAAA-MM-DD, padrão: hoje) ou start e
+    end explícitos, e course (id da disciplina).
+    """
+    params = parse_calendar_params(request.GET)
+    course_filter = request.GET.get('course', '')
+    course_id = int(course_filter) if course_filter.isdigit() else None
+
+    return JsonResponse({
+        'success': True,
+        'view': params['view'],
+        'start': params['start'],
+        'end': params['end'],
+        'days': cached_day_buckets(request.user, params['start'], params['end'], course_id=course_id),
+    })
+
+
+@api_view
+def search_api(request):
+    """
+    Busca aproximada de atividades, ordenada por relevância
+
+    Parâmetros: q (texto), course (id da disciplina), due_from e due_to (AAAA-MM-DD).
+    """
+    results = search_assignments(request.user, request.GET.get('q', ''), **parse_search_filters(request.GET))
+
+    return JsonResponse({
+        'success': True,
+        'assignments': [
+            dict(_serialize_assignment(assignment), rank=round(assignment.rank, 3))
+            for assignment in results
+        ],
+    })
+
+
+@login_required
+@require_GET
+def export_assignments_csv(request):
+    """Download de todas as atividades do usuário em CSV, gerado em streaming"""
+    filename = f'atividades-{timezone.localdate().isoformat()}.csv'
+
+    response = StreamingHttpResponse(stream_csv(request.user.id), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def calendar_etag(request, token):
+    """ETag do feed .ics: versão dos dados do dono do token"""
+    user_id = user_id_from_ics_token(token)
+    return str(data_version(user_id)) if user_id else None
+
+
+@require_GET
+@condition(etag_func=calendar_etag)
+def calendar_feed(request, token):
+    """
+    Feed iCalendar com os prazos do usuário, para assinatura em apps de calendário
+
+    Autenticado pelo token assinado da URL. Os clientes atualizam o feed a cada
+    poucos minutos; enquanto nada muda, recebem 304 pela ETag sem nenhuma
+    consulta às atividades.
+    """
+    user_id = user_id_from_ics_token(token)
+    if user_id is None:
+        raise Http404('Calendário não encontrado')
+
+    response = StreamingHttpResponse(stream_ics(user_id), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="unatrack.ics"'
+    return response
+
+
+def _serialize_assignment(assignment):
+    """Representação JSON de uma atividade"""
+    return {
+        'id': assignment.id,
+        'title': assignment.title,
+        'due_date': assignment.due_date,
+        'completed': assignment.completed,
+        'course': {'id': assignment.course_id, 'name': assignment.course.name},
+    }
@@ -1 +1,13 @@
 from django.contrib import admin
+from .models import EmailOutbox
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin da fila de e-mails de alerta"""
+
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'available_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('to_email', 'user__email', 'idempotency_key')
+    ordering = ('-created_at',)
+    readonly_fields = ('idempotency_key', 'created_at', 'locked_at', 'sent_at', 'assignments')
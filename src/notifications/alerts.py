@@ -0,0 +1,236 @@
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import attrgetter
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DateField, Exists, ExpressionWrapper, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from core.models import Assignment
+from .models import EmailOutbox
+from .rendering import render_alert_email
+
+logger = logging.getLogger(__name__)
+
+# Antecedência usada quando o usuário não define dias_antecedencia_alerta
+DEFAULT_ALERT_DAYS = 3
+
+# Horário da varredura diária (beat 'send-assignment-alerts'): nenhum alerta sai antes dele
+ALERT_SWEEP_TIME = time(6, 0)
+
+
+def alert_candidates(today, user_id=None, user_ids=None):
+    """
+    Atividades pendentes que devem ser alertadas, de todos os usuários, em uma única consulta
+
+    A janela de alerta de cada usuário (dias_antecedencia_alerta) é aplicada no SQL,
+    juntando Assignment às preferências do usuário. Cada atividade entra em no
+    máximo um e-mail por dia: a avaliação incremental após uma sincronização e a
+    varredura diária não alertam a mesma atividade duas vezes, mesmo quando um
+    prazo alterado limpou alert_sent.
+
+    Args:
+        today (date): Data de referência
+        user_id (int): Restringe a um usuário específico
+        user_ids (List[int]): Restringe a um grupo de usuários
+
+    Returns:
+        QuerySet: Atividades a alertar
+    """
+    alert_days = Coalesce(NullIf(F('user__dias_antecedencia_alerta'), Value(0)), Value(DEFAULT_ALERT_DAYS))
+    alert_date = ExpressionWrapper(Value(today, output_field=DateField()) + alert_days, output_field=DateField())
+
+    assignments = Assignment.objects.filter(
+        user__receber_emails=True,
+        completed=False,
+        alert_sent=False,
+        due_date__isnull=False,
+        due_date__gte=today,
+        due_date__lte=alert_date,
+    )
+
+    # Atividades que já estão em um e-mail na fila de envio, ou em um enviado hoje,
+    # não são alertadas de novo
+    day_start = timezone.make_aware(datetime.combine(today, time.min))
+    queued_or_sent_today = EmailOutbox.objects.filter(assignments=OuterRef('pk')).filter(
+        Q(status__in=[EmailOutbox.STATUS_PENDING, EmailOutbox.STATUS_SENDING])
+        | Q(status=EmailOutbox.STATUS_SENT, created_at__gte=day_start)
+    )
+    assignments = assignments.exclude(Exists(queued_or_sent_today))
+
+    if user_id:
+        assignments = assignments.filter(user_id=user_id)
+
+    if user_ids is not None:
+        assignments = assignments.filter(user_id__in=user_ids)
+
+    return assignments
+
+
+def alert_candidate_user_ids(today):
+    """
+    IDs dos usuários que têm atividades a alertar hoje
+
+    Args:
+        today (date): Data de referência
+
+    Returns:
+        List[int]: IDs ordenados
+    """
+    return list(
+        alert_candidates(today)
+        .order_by('user_id')
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+
+
+def iter_user_alerts(today, user_id=None, user_ids=None, chunk_size=2000):
+    """
+    Percorre as atividades a alertar agrupadas por usuário, em streaming
+
+    Cada atividade recebe o atributo days_until_due.
+
+    Args:
+        today (date): Data de referência
+        user_id (int): Restringe a um usuário específico
+        user_ids (List[int]): Restringe a um grupo de usuários
+        chunk_size (int): Linhas buscadas por vez no cursor do banco
+
+    Yields:
+        Tuple[CustomUser, List[Assignment]]: Usuário e suas atividades ordenadas pelo vencimento
+    """
+    assignments = (
+        alert_candidates(today, user_id=user_id, user_ids=user_ids)
+        .select_related('course', 'user')
+        .order_by('user_id', 'due_date', 'id')
+    )
+
+    for _, rows in groupby(assignments.iterator(chunk_size=chunk_size), key=attrgetter('user_id')):
+        user_assignments = list(rows)
+        for assignment in user_assignments:
+            assignment.days_until_due = (assignment.due_date - today).days
+
+        yield user_assignments[0].user, user_assignments
+
+
+def delivery_slot(user, today, now=None):
+    """
+    Horário de envio do alerta de um usuário no dia
+
+    Usa o horário preferido do usuário, se definido. Sem preferência, o envio
+    cai em um horário estável dentro da janela ALERT_DELIVERY_WINDOW_START-END,
+    derivado do ID do usuário, espalhando os e-mails ao longo da manhã.
+    Horários que já passaram viram envio imediato, então uma preferência
+    anterior a ALERT_SWEEP_TIME resultaria em envio no horário da varredura; a
+    tela de configurações não aceita esses horários.
+
+    Args:
+        user (CustomUser): Destinatário
+        today (date): Data de referência
+        now (datetime): Momento atual (padrão: timezone.now())
+
+    Returns:
+        datetime: Momento a partir do qual o e-mail pode ser enviado
+    """
+    tz = timezone.get_current_timezone()
+
+    if user.horario_preferido_alerta:
+        slot = datetime.combine(today, user.horario_preferido_alerta, tzinfo=tz)
+    else:
+        start = datetime.combine(today, time.fromisoformat(settings.ALERT_DELIVERY_WINDOW_START), tzinfo=tz)
+        end = datetime.combine(today, time.fromisoformat(settings.ALERT_DELIVERY_WINDOW_END), tzinfo=tz)
+        window = max(int((end - start).total_seconds()), 1)
+        offset = int(hashlib.sha1(str(user.id).encode()).hexdigest(), 16) % window
+        slot = start + timedelta(seconds=offset)
+
+    return max(slot, now or timezone.now())
+
+
+def alert_idempotency_key(user_id, today, assignment_ids):
+    """
+    Chave estável de um alerta: mesmo usuário, dia e conjunto de atividades
+    geram sempre a mesma chave, impedindo mensagens duplicadas na fila
+    """
+    digest = hashlib.sha1(','.join(str(i) for i in sorted(assignment_ids)).encode()).hexdigest()[:16]
+    return f'assignment-alert:{user_id}:{today.isoformat()}:{digest}'
+
+
+def enqueue_user_alerts(today, user_id=None, user_ids=None, batch_size=500):
+    """
+    Renderiza os alertas e os grava na fila de e-mails (EmailOutbox)
+
+    Cada mensagem é gravada na mesma transação que a liga às suas atividades,
+    disponível a partir do horário de envio do usuário (delivery_slot).
+    O envio e a marcação de alert_sent ficam com o worker da fila.
+
+    Args:
+        today (date): Data de referência
+        user_id (int): Restringe a um usuário específico
+        user_ids (List[int]): Restringe a um grupo de usuários
+        batch_size (int): Mensagens gravadas por transação
+
+    Returns:
+        Dict: {'users_processed', 'messages_queued'}
+    """
+    result = {'users_processed': 0, 'messages_queued': 0}
+    entries = []
+    now = timezone.now()
+
+    for user, assignments in iter_user_alerts(today, user_id=user_id, user_ids=user_ids):
+        assignment_ids = [assignment.id for assignment in assignments]
+        message = EmailOutbox(
+            user=user,
+            idempotency_key=alert_idempotency_key(user.id, today, assignment_ids),
+            to_email=user.email,
+            available_at=delivery_slot(user, today, now),
+            **render_alert_email(user, assignments),
+        )
+        entries.append((message, assignment_ids))
+        result['users_processed'] += 1
+
+        if len(entries) >= batch_size:
+            result['messages_queued'] += _write_outbox(entries)
+            entries = []
+
+    if entries:
+        result['messages_queued'] += _write_outbox(entries)
+
+    return result
+
+
+def _write_outbox(entries):
+    """
+    Grava um lote de mensagens e suas atividades em uma única transação
+
+    Mensagens cuja chave de idempotência já existe são ignoradas.
+
+    Returns:
+        int: Mensagens pendentes do lote
+    """
+    keys = [message.idempotency_key for message, _ in entries]
+    Through = EmailOutbox.assignments.through
+
+    with transaction.atomic():
+        EmailOutbox.objects.bulk_create([message for message, _ in entries], ignore_conflicts=True)
+
+        ids_by_key = dict(
+            EmailOutbox.objects.filter(idempotency_key__in=keys, status=EmailOutbox.STATUS_PENDING)
+            .values_list('idempotency_key', 'id')
+        )
+
+        Through.objects.bulk_create(
+            [
+                Through(emailoutbox_id=ids_by_key[message.idempotency_key], assignment_id=assignment_id)
+                for message, assignment_ids in entries
+                if message.idempotency_key in ids_by_key
+                for assignment_id in assignment_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+    return len(ids_by_key)
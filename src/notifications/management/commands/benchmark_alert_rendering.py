@@ -0,0 +1,98 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import Assignment, Course
+from user.models import CustomUser
+from notifications.rendering import render_alert_email, render_assignment_card
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão de renderização dos e-mails de alerta (sem cache x com cache)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10000,
+            help='Quantidade de destinatários simulados',
+        )
+        parser.add_argument(
+            '--assignments-per-user',
+            type=int,
+            default=3,
+            help='Atividades por e-mail',
+        )
+        parser.add_argument(
+            '--distinct-assignments',
+            type=int,
+            default=300,
+            help='Atividades distintas compartilhadas entre os alunos (mesma turma)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semente do gerador de dados',
+        )
+
+    def handle(self, *args, **options):
+        recipients = self._build_recipients(options)
+        total_users = len(recipients)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Renderizando {total_users} e-mails com {options["assignments_per_user"]} atividades cada'
+        ))
+
+        # Referência: render_to_string de todos os templates a cada e-mail
+        before = self._measure(recipients, cached=False)
+
+        # Templates compilados e cartões compartilhados, começando com o cache vazio
+        render_assignment_card.cache_clear()
+        after = self._measure(recipients, cached=True)
+        cache_info = render_assignment_card.cache_info()
+
+        self.stdout.write('\n' + '='*50)
+        self._report('Sem cache', before, total_users)
+        self._report('Com cache', after, total_users)
+        self.stdout.write(f'   Cartões: {cache_info.hits} reaproveitados, {cache_info.misses} renderizados')
+        self.stdout.write(self.style.SUCCESS(f'   Ganho: {before / after:.1f}x'))
+
+    def _build_recipients(self, options):
+        """Monta destinatários e atividades em memória, sem acessar o banco"""
+        rng = random.Random(options['seed'])
+        today = timezone.now().date()
+        per_user = max(options['assignments_per_user'], 1)
+        distinct = max(options['distinct_assignments'], per_user)
+
+        courses = [Course(name=f'Disciplina {i + 1}') for i in range(max(distinct // 5, 1))]
+        pool = []
+        for i in range(distinct):
+            days_until_due = rng.randint(0, 3)
+            pool.append((f'Atividade {i + 1}', rng.choice(courses), today + timedelta(days=days_until_due), days_until_due))
+
+        recipients = []
+        for i in range(max(options['users'], 1)):
+            user = CustomUser(id=i + 1, first_name=f'Aluno {i + 1}', email=f'aluno{i + 1}@example.com')
+            assignments = []
+            for title, course, due_date, days_until_due in rng.sample(pool, per_user):
+                assignment = Assignment(title=title, course=course, due_date=due_date)
+                assignment.days_until_due = days_until_due
+                assignments.append(assignment)
+            recipients.append((user, assignments))
+
+        return recipients
+
+    def _measure(self, recipients, cached):
+        """Tempo total (segundos) para renderizar todos os e-mails"""
+        start = time.perf_counter()
+        for user, assignments in recipients:
+            render_alert_email(user, assignments, cached=cached)
+        return time.perf_counter() - start
+
+    def _report(self, label, elapsed, total_users):
+        self.stdout.write(
+            f'   {label}: {elapsed:.2f}s - {total_users / elapsed:.0f} e-mails/s '
+            f'({elapsed * 1000 / total_users:.3f} ms por e-mail)'
+        )
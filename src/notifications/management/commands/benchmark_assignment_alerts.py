@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from core.models import Assignment, Course
+from core.scratch import create_users, scratch_database
+from notifications.alerts import enqueue_user_alerts, iter_user_alerts
+from notifications.models import EmailOutbox
+from notifications.outbox import drain_outbox
+from notifications.rendering import render_alert_email, render_assignment_card
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o pipeline de alertas (seleção, renderização, fila e envio) com usuários '
+        'sintéticos em um banco temporário. O usuário do banco precisa de permissão CREATEDB.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help='Quantidade de usuários sintéticos',
+        )
+        parser.add_argument(
+            '--assignments-per-user',
+            type=int,
+            default=3,
+            help='Atividades dentro da janela de alerta por usuário',
+        )
+        parser.add_argument(
+            '--smtp',
+            action='store_true',
+            help='Envia pelo EMAIL_BACKEND configurado (ex.: MailHog) em vez do backend locmem',
+        )
+
+    def handle(self, *args, **options):
+        users = max(options['users'], 1)
+        per_user = max(options['assignments_per_user'], 1)
+        email_backend = None if options['smtp'] else 'django.core.mail.backends.locmem.EmailBackend'
+
+        overrides = {'ALERT_SEND_RATE_PER_MINUTE': 0}
+        if email_backend:
+            overrides['EMAIL_BACKEND'] = email_backend
+
+        # Banco temporário: os dados sintéticos nunca tocam o banco real
+        with scratch_database() as name:
+            self.stdout.write(self.style.SUCCESS(f'Banco temporário criado: {name}'))
+            with override_settings(**overrides):
+                self._run(users, per_user)
+        self.stdout.write('Banco temporário removido')
+
+    def _run(self, users, per_user):
+        today = timezone.now().date()
+        stages = []
+
+        seed_time, _ = self._timed(lambda: self._seed(users, per_user, today))
+        self.stdout.write(f'   {users} usuários e {users * per_user} atividades criados em {seed_time:.2f}s')
+
+        # Seleção: consulta única agrupada por usuário
+        selection = self._stage('Seleção', lambda: list(iter_user_alerts(today)))
+        stages.append(selection)
+        recipients = selection['result']
+
+        # Renderização com o cache de cartões vazio
+        render_assignment_card.cache_clear()
+        stages.append(self._stage(
+            'Renderização',
+            lambda: [render_alert_email(user, assignments) for user, assignments in recipients],
+        ))
+
+        # Caminho real do job diário: seleção + renderização + gravação na fila
+        enqueue = self._stage('Fila (job completo)', lambda: enqueue_user_alerts(today))
+        stages.append(enqueue)
+
+        # Ignora a janela de envio para medir apenas a entrega
+        EmailOutbox.objects.update(available_at=timezone.now())
+        send = self._stage('Envio', lambda: drain_outbox())
+        stages.append(send)
+
+        self.stdout.write('\n' + '='*50)
+        for stage in stages:
+            self.stdout.write(
+                f'   {stage["label"]}: {stage["elapsed"]:.2f}s, {stage["queries"]} consultas'
+            )
+
+        emails_sent = send['result']['sent']
+        total = enqueue['elapsed'] + send['elapsed']
+        self.stdout.write(f'   E-mails enviados: {emails_sent} ({send["result"]["failed"]} falhas)')
+        self.stdout.write(self.style.SUCCESS(
+            f'   Envio: {emails_sent / send["elapsed"]:.0f} e-mails/s; '
+            f'pipeline completo: {emails_sent / total:.0f} e-mails/s'
+        ))
+
+    def _seed(self, users, per_user, today):
+        """Cria usuários, disciplinas e atividades sintéticas com bulk_create"""
+        created_users = create_users(
+            'bench', users, last_name='Benchmark', dias_antecedencia_alerta=3, receber_emails=True,
+        )
+
+        courses = Course.objects.bulk_create([
+            Course(user=user, name='Disciplina Benchmark', instructor='Professor')
+            for user in created_users
+        ], batch_size=1000)
+
+        Assignment.objects.bulk_create([
+            Assignment(
+                user=course.user,
+                course=course,
+                title=f'Atividade {n + 1}',
+                due_date=today + timedelta(days=n % 3),
+            )
+            for course in courses
+            for n in range(per_user)
+        ], batch_size=2000)
+
+    def _stage(self, label, func):
+        """Executa uma etapa medindo tempo e número de consultas"""
+        with CaptureQueriesContext(connection) as queries:
+            elapsed, result = self._timed(func)
+        return {'label': label, 'elapsed': elapsed, 'queries': len(queries), 'result': result}
+
+    def _timed(self, func):
+        start = time.perf_counter()
+        result = func()
+        return time.perf_counter() - start, result
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from notifications.outbox import outbox_stats
+
+
+class Command(BaseCommand):
+    help = 'Mostra a profundidade e a taxa de envio da fila de e-mails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=5,
+            help='Janela (minutos) usada no cálculo da taxa de envio',
+        )
+
+    def handle(self, *args, **options):
+        window = max(options['window'], 1)
+        stats = outbox_stats(window_minutes=window)
+
+        self.stdout.write(self.style.SUCCESS('Fila de e-mails'))
+        self.stdout.write(f'   Na fila: {stats["queue_depth"]} ({stats["pending"]} pendentes, {stats["sending"]} em envio)')
+        self.stdout.write(f'   Agendados para mais tarde: {stats["scheduled"]}')
+        self.stdout.write(f'   Mensagem pendente mais antiga: {stats["oldest_pending_age"]}s')
+        self.stdout.write(f'   Taxa de envio (últimos {window} min): {stats["drain_rate"]} e-mails/min')
+        self.stdout.write(f'   Enviados: {stats["sent"]}')
+        if stats['failed']:
+            self.stdout.write(self.style.ERROR(f'   Falhas definitivas: {stats["failed"]}'))
@@ -1,11 +1,10 @@
+from collections import Counter
 from django.core.management.base import BaseCommand
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.utils import timezone
 from django.conf import settings
-from datetime import timedelta
-from core.models import Assignment
-from user.models import CustomUser
+from notifications.alerts import delivery_slot, enqueue_user_alerts, iter_user_alerts
+from notifications.outbox import drain_outbox, outbox_stats
+from notifications.rendering import render_alert_email
 
 
 class Command(BaseCommand):
@@ -22,6 +21,17 @@ class Command(BaseCommand):
             type=int,
             help='Envia apenas para um usuário específico',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ALERT_EMAIL_BATCH_SIZE,
+            help='Quantidade de e-mails enviados por conexão SMTP',
+        )
+        parser.add_argument(
+            '--enqueue-only',
+            action='store_true',
+            help='Apenas grava os e-mails na fila, deixando o envio para o worker email-outbox',
+        )
 
     def handle(self, *args, **options):
         dry_run = options.get('dry_run', False)
@@ -29,105 +39,67 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS('Iniciando envio de alertas de atividades'))
 
-        users = CustomUser.objects.filter(receber_emails=True)
-
-        if user_id:
-            users = users.filter(id=user_id)
-
-        total_emails_sent = 0
-        total_users_notified = 0
-
-        for user in users:
+        today = timezone.now().date()
 
-            # Buscar atividades pendentes do usuário
-            today = timezone.now().date()
-            alert_days = user.dias_antecedencia_alerta or 3
-            alert_date = today + timedelta(days=alert_days)
+        if dry_run:
+            total_users_notified = 0
+            now = timezone.now()
+            slots_per_hour = Counter()
 
-            # Buscar atividades não concluídas com vencimento dentro do período de alerta
-            assignments = Assignment.objects.filter(
-                user=user,
-                completed=False,
-                due_date__isnull=False,
-                due_date__gte=today,
-                due_date__lte=alert_date,
-                alert_sent=False  # Não enviar se já foi enviado alerta
-            ).select_related('course').order_by('due_date')
+            # Uma única consulta para todos os usuários: apenas quem tem atividades
+            # dentro da própria janela de alerta aparece aqui
+            for user, assignments in iter_user_alerts(today, user_id=user_id):
+                email = render_alert_email(user, assignments)
+                slot = timezone.localtime(delivery_slot(user, today, now))
+                slots_per_hour[slot.strftime('%H:00')] += 1
 
-            if not assignments.exists():
                 self.stdout.write(
-                    f'  Usuário {user.email}: Sem atividades para alertar'
+                    self.style.WARNING(f'  [DRY RUN] Enviaria e-mail para {user.email}')
                 )
-                continue
-
-            # Calcular dias até o vencimento para cada atividade
-            assignments_with_days = []
-            for assignment in assignments:
-                days_until_due = (assignment.due_date - today).days
-                assignment.days_until_due = days_until_due
-                assignments_with_days.append(assignment)
-
-            # Preparar contexto do e-mail
-            context = {
-                'user': user,
-                'assignments': assignments_with_days,
-                'site_url': 'http://localhost:8000/dashboard/',
-                'settings_url': 'http://localhost:8000/dashboard/settings/',
-            }
-
-            html_message = render_to_string('emails/assignment_alert.html', context)
-            text_message = render_to_string('emails/assignment_alert.txt', context)
-
-            subject = f'UnaTrack: {len(assignments)} atividade{"s" if len(assignments) > 1 else ""} próxima{"s" if len(assignments) > 1 else ""} do vencimento'
-
-            if dry_run:
+                self.stdout.write(f'    Assunto: {email["subject"]}')
                 self.stdout.write(
-                    self.style.WARNING(f'  [DRY RUN] Enviaria e-mail para {user.email}')
+                    f'    Horário de envio: {slot:%H:%M:%S}'
+                    f'{" (preferido pelo usuário)" if user.horario_preferido_alerta else ""}'
                 )
-                self.stdout.write(f'    Assunto: {subject}')
                 self.stdout.write(f'    Atividades: {len(assignments)}')
-                for assignment in assignments_with_days:
+                for assignment in assignments:
                     self.stdout.write(
                         f'      - {assignment.title} ({assignment.days_until_due} dias)'
                     )
-            else:
-                try:
-                    # Enviar e-mail
-                    send_mail(
-                        subject=subject,
-                        message=text_message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[user.email],
-                        html_message=html_message,
-                        fail_silently=False,
-                    )
+                total_users_notified += 1
 
-                    assignments.update(
-                        alert_sent=True,
-                        alert_sent_at=timezone.now()
-                    )
+            self.stdout.write('\n' + '='*50)
+            self.stdout.write(
+                self.style.WARNING(f'DRY RUN: {total_users_notified} e-mails seriam enviados')
+            )
+            self.stdout.write(
+                f'   Janela de envio: {settings.ALERT_DELIVERY_WINDOW_START}-{settings.ALERT_DELIVERY_WINDOW_END}'
+                f' (limite de {settings.ALERT_SEND_RATE_PER_MINUTE} e-mails/min)'
+            )
+            for hour, total in sorted(slots_per_hour.items()):
+                self.stdout.write(f'   {hour}: {total} e-mails')
+            return
 
-                    self.stdout.write(
-                        self.style.SUCCESS(f'   E-mail enviado para {user.email}')
-                    )
-                    self.stdout.write(f'    Atividades alertadas: {len(assignments)}')
+        # Grava os e-mails na fila, cada um disponível no horário do usuário;
+        # o envio e a marcação de alert_sent acontecem apenas na entrega
+        queued = enqueue_user_alerts(today, user_id=user_id)
+        self.stdout.write(f'   E-mails gravados na fila: {queued["messages_queued"]}')
 
-                    total_emails_sent += 1
-                    total_users_notified += 1
+        if options.get('enqueue_only'):
+            self.stdout.write('\n' + '='*50)
+            self.stdout.write(self.style.SUCCESS('E-mails na fila, aguardando o worker email-outbox'))
+            return
 
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'  Erro ao enviar e-mail para {user.email}: {str(e)}')
-                    )
+        result = drain_outbox(batch_size=options.get('batch_size'))
 
         self.stdout.write('\n' + '='*50)
-        if dry_run:
-            self.stdout.write(
-                self.style.WARNING(f'DRY RUN: {total_users_notified} e-mails seriam enviados')
-            )
-        else:
+        self.stdout.write(
+            self.style.SUCCESS(f'Processo concluído!')
+        )
+        self.stdout.write(f'   Total de e-mails enviados: {result["sent"]}')
+        self.stdout.write(f'   Reagendados após falha: {result["retried"]}')
+        self.stdout.write(f'   Agendados para mais tarde: {outbox_stats()["scheduled"]}')
+        if result['failed']:
             self.stdout.write(
-                self.style.SUCCESS(f'Processo concluído!')
+                self.style.ERROR(f'   Falhas definitivas: {result["failed"]}')
             )
-            self.stdout.write(f'   Total de e-mails enviados: {total_emails_sent}')
-            self.stdout.write(f'   Total de usuários notificados: {total_users_notified}')
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.7 on 2026-10-19 11:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0003_alter_assignment_due_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=128, unique=True, verbose_name='Chave de Idempotência')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Destinatário')),
+                ('subject', models.CharField(max_length=255, verbose_name='Assunto')),
+                ('body_text', models.TextField(verbose_name='Corpo (texto)')),
+                ('body_html', models.TextField(blank=True, default='', verbose_name='Corpo (HTML)')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('sending', 'Enviando'), ('sent', 'Enviado'), ('failed', 'Falhou')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Último Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Disponível em')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')),
+                ('assignments', models.ManyToManyField(blank=True, related_name='alert_messages', to='core.assignment', verbose_name='Atividades')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_outbox', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'E-mail na Fila',
+                'verbose_name_plural': 'Fila de E-mails',
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'), models.Index(fields=['status', 'sent_at'], name='outbox_status_sent_idx')],
+            },
+        ),
+    ]
@@ -1 +1,46 @@
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class EmailOutbox(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendente'),
+        (STATUS_SENDING, 'Enviando'),
+        (STATUS_SENT, 'Enviado'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='email_outbox', verbose_name='Usuário')
+    idempotency_key = models.CharField(max_length=128, unique=True, verbose_name='Chave de Idempotência')
+    to_email = models.EmailField(verbose_name='Destinatário')
+    subject = models.CharField(max_length=255, verbose_name='Assunto')
+    body_text = models.TextField(verbose_name='Corpo (texto)')
+    body_html = models.TextField(blank=True, default='', verbose_name='Corpo (HTML)')
+    assignments = models.ManyToManyField('core.Assignment', blank=True, related_name='alert_messages', verbose_name='Atividades')
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Status')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Tentativas')
+    last_error = models.TextField(blank=True, default='', verbose_name='Último Erro')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    available_at = models.DateTimeField(default=timezone.now, verbose_name='Disponível em')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Reservado em')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Enviado em')
+
+    class Meta:
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+            models.Index(fields=['status', 'sent_at'], name='outbox_status_sent_idx'),
+        ]
+        verbose_name = 'E-mail na Fila'
+        verbose_name_plural = 'Fila de E-mails'
+
+    def __str__(self):
+        return f"{self.subject} - {self.to_email} ({self.get_status_display()})"
@@ -0,0 +1,327 @@
+from datetime import timedelta
+from time import monotonic, sleep
+import logging
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from core.models import Assignment
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Espera (segundos) quando o limite de envios por minuto é atingido
+RATE_LIMIT_WAIT = 5
+
+# Chave do advisory lock que serializa as reservas quando há limite de envios
+CLAIM_LOCK_KEY = 7310
+
+
+def claim_messages(limit):
+    """
+    Reserva mensagens pendentes para envio
+
+    Usa SELECT ... FOR UPDATE SKIP LOCKED, então vários workers podem drenar a
+    fila ao mesmo tempo sem pegar a mesma mensagem. Com ALERT_SEND_RATE_PER_MINUTE,
+    a reserva também consome o limite de envios: as reservas dos workers são
+    serializadas por um advisory lock e cada uma vê as mensagens já reservadas
+    pelas anteriores, então o limite não é ultrapassado.
+
+    Args:
+        limit (int): Quantidade máxima de mensagens
+
+    Returns:
+        List[EmailOutbox]: Mensagens reservadas (status 'sending')
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        if settings.ALERT_SEND_RATE_PER_MINUTE > 0:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_KEY])
+            limit = min(limit, send_budget())
+            if limit <= 0:
+                return []
+
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.STATUS_PENDING, available_at__lte=now)
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+
+        if not ids:
+            return []
+
+        EmailOutbox.objects.filter(id__in=ids).update(
+            status=EmailOutbox.STATUS_SENDING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by('available_at', 'id'))
+
+
+def release_stale_messages():
+    """
+    Devolve à fila mensagens presas em 'sending' por um worker que caiu
+
+    Returns:
+        int: Mensagens devolvidas
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.ALERT_OUTBOX_LOCK_TIMEOUT)
+    released = EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_SENDING,
+        locked_at__lt=cutoff,
+    ).update(status=EmailOutbox.STATUS_PENDING, locked_at=None)
+
+    if released:
+        logger.warning(f"{released} mensagens presas em envio voltaram para a fila")
+
+    return released
+
+
+def deliver_messages(messages, connection=None):
+    """
+    Envia mensagens reservadas por uma única conexão SMTP
+
+    A conexão é aberta uma vez para o lote inteiro. Se o servidor derrubar a
+    conexão, ela é reaberta e a mensagem é reenviada uma vez. Falhas de uma
+    mensagem não interrompem as demais. Cada mensagem (e suas atividades, com
+    alert_sent) é marcada como enviada logo que o servidor a aceita: se o worker
+    cair no meio do lote, release_stale_messages devolve à fila apenas as que
+    ainda não saíram.
+
+    Args:
+        messages (List[EmailOutbox]): Mensagens reservadas por claim_messages
+        connection: Conexão de e-mail (padrão: EMAIL_BACKEND configurado)
+
+    Returns:
+        Dict: {'sent', 'retried', 'failed'}
+    """
+    result = {'sent': 0, 'retried': 0, 'failed': 0}
+    if not messages:
+        return result
+
+    connection = connection or get_connection(fail_silently=False)
+    failures = []
+
+    try:
+        connection.open()
+    except OSError as e:
+        logger.error(f"Erro ao conectar ao servidor de e-mail: {str(e)}")
+        failures = [(message, e) for message in messages]
+    else:
+        try:
+            for message in messages:
+                try:
+                    _send_with_reconnect(connection, _build_email(message))
+                except Exception as e:
+                    logger.error(f"Erro ao enviar alerta para {message.to_email}: {str(e)}")
+                    failures.append((message, e))
+                else:
+                    _mark_sent([message.id])
+                    result['sent'] += 1
+        finally:
+            _close_connection(connection)
+
+    for message, error in failures:
+        if _record_failure(message, error):
+            result['retried'] += 1
+        else:
+            result['failed'] += 1
+
+    return result
+
+
+def send_budget():
+    """
+    E-mails que ainda podem ser enviados sem ultrapassar ALERT_SEND_RATE_PER_MINUTE
+
+    O limite é global: conta as mensagens enviadas ou reservadas para envio no
+    último minuto por todos os workers.
+
+    Returns:
+        int: Envios disponíveis agora, ou None se não há limite
+    """
+    rate = settings.ALERT_SEND_RATE_PER_MINUTE
+    if rate <= 0:
+        return None
+
+    cutoff = timezone.now() - timedelta(minutes=1)
+    used_last_minute = EmailOutbox.objects.filter(
+        Q(status=EmailOutbox.STATUS_SENT, sent_at__gte=cutoff)
+        | Q(status=EmailOutbox.STATUS_SENDING, locked_at__gte=cutoff)
+    ).count()
+    return max(rate - used_last_minute, 0)
+
+
+def drain_outbox(batch_size=None, time_limit=None):
+    """
+    Envia mensagens disponíveis até esvaziar a fila ou esgotar o tempo
+
+    Respeita o limite global de envios por minuto, aguardando quando ele é
+    atingido.
+
+    Args:
+        batch_size (int): Mensagens por conexão SMTP (padrão: ALERT_EMAIL_BATCH_SIZE)
+        time_limit (float): Tempo máximo em segundos (padrão: sem limite)
+
+    Returns:
+        Dict: {'sent', 'retried', 'failed'}
+    """
+    batch_size = max(batch_size or settings.ALERT_EMAIL_BATCH_SIZE, 1)
+    deadline = monotonic() + time_limit if time_limit else None
+    totals = {'sent': 0, 'retried': 0, 'failed': 0}
+
+    while deadline is None or monotonic() < deadline:
+        budget = send_budget()
+        if budget == 0:
+            if deadline is not None and monotonic() + RATE_LIMIT_WAIT >= deadline:
+                break
+            sleep(RATE_LIMIT_WAIT)
+            continue
+
+        # claim_messages aplica o limite atomicamente; o orçamento acima só decide a espera
+        messages = claim_messages(batch_size)
+        if not messages:
+            if send_budget() == 0:
+                continue
+            break
+
+        result = deliver_messages(messages)
+        for key in totals:
+            totals[key] += result[key]
+
+    return totals
+
+
+def outbox_stats(window_minutes=5):
+    """
+    Profundidade da fila e taxa de envio recente
+
+    Args:
+        window_minutes (int): Janela usada para calcular a taxa de envio
+
+    Returns:
+        Dict: Contagem por status, queue_depth, scheduled (agendadas para
+            mais tarde), drain_rate (e-mails/min) e oldest_pending_age (segundos)
+    """
+    now = timezone.now()
+
+    counts = dict(
+        EmailOutbox.objects.order_by().values_list('status').annotate(total=Count('id'))
+    )
+    sent_recently = EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_SENT,
+        sent_at__gte=now - timedelta(minutes=window_minutes),
+    ).count()
+    oldest_pending = EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_PENDING,
+    ).aggregate(oldest=Min('available_at'))['oldest']
+    scheduled = EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_PENDING,
+        available_at__gt=now,
+    ).count()
+
+    stats = {status: counts.get(status, 0) for status, _ in EmailOutbox.STATUS_CHOICES}
+    stats['queue_depth'] = stats[EmailOutbox.STATUS_PENDING] + stats[EmailOutbox.STATUS_SENDING]
+    stats['scheduled'] = scheduled
+    stats['drain_rate'] = round(sent_recently / window_minutes, 2)
+    stats['oldest_pending_age'] = max(int((now - oldest_pending).total_seconds()), 0) if oldest_pending else 0
+    return stats
+
+
+def _build_email(message):
+    """Monta o EmailMultiAlternatives de uma mensagem da fila"""
+    email = EmailMultiAlternatives(
+        subject=message.subject,
+        body=message.body_text,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[message.to_email],
+        headers={'X-UnaTrack-Idempotency-Key': message.idempotency_key},
+    )
+    if message.body_html:
+        email.attach_alternative(message.body_html, 'text/html')
+    return email
+
+
+def _mark_sent(message_ids):
+    """Marca as mensagens como enviadas e suas atividades como alertadas"""
+    if not message_ids:
+        return
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        EmailOutbox.objects.filter(id__in=message_ids).update(
+            status=EmailOutbox.STATUS_SENT,
+            sent_at=now,
+            locked_at=None,
+            last_error='',
+        )
+        Assignment.objects.filter(alert_messages__id__in=message_ids).update(
+            alert_sent=True,
+            alert_sent_at=now,
+        )
+
+
+def _record_failure(message, error):
+    """
+    Registra a falha de envio e agenda nova tentativa com backoff exponencial
+
+    Returns:
+        bool: True se a mensagem voltou para a fila, False se desistiu dela
+    """
+    retry = message.attempts < settings.ALERT_OUTBOX_MAX_ATTEMPTS
+    backoff = 60 * 2 ** max(message.attempts - 1, 0)
+
+    EmailOutbox.objects.filter(id=message.id).update(
+        status=EmailOutbox.STATUS_PENDING if retry else EmailOutbox.STATUS_FAILED,
+        available_at=timezone.now() + timedelta(seconds=backoff),
+        locked_at=None,
+        last_error=str(error)[:1000],
+    )
+    return retry
+
+
+def _send_with_reconnect(connection, email):
+    """
+    Envia uma mensagem, reabrindo a conexão uma vez se o servidor a derrubou
+
+    Erros de SMTP da própria mensagem (destinatário recusado, dados
+    rejeitados) não provocam reconexão.
+    """
+    email.connection = connection
+
+    try:
+        sent = connection.send_messages([email])
+    except smtplib.SMTPServerDisconnected:
+        pass
+    except smtplib.SMTPException:
+        raise
+    except OSError:
+        pass
+    else:
+        if not sent:
+            raise smtplib.SMTPException('Mensagem não enviada')
+        return
+
+    logger.warning("Conexão SMTP perdida, reconectando")
+    _close_connection(connection)
+    connection.open()
+
+    if not connection.send_messages([email]):
+        raise smtplib.SMTPException('Mensagem não enviada')
+
+
+def _close_connection(connection):
+    """Fecha a conexão ignorando erros de um servidor que já desconectou"""
+    try:
+        connection.close()
+    except Exception:
+        pass
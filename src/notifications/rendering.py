@@ -0,0 +1,107 @@
+from functools import lru_cache
+
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+ALERT_TEMPLATE_HTML = 'emails/assignment_alert.html'
+ALERT_TEMPLATE_TEXT = 'emails/assignment_alert.txt'
+CARD_TEMPLATE_HTML = 'emails/assignment_card.html'
+CARD_TEMPLATE_TEXT = 'emails/assignment_card.txt'
+
+SITE_URL = 'http://localhost:8000/dashboard/'
+SETTINGS_URL = 'http://localhost:8000/dashboard/settings/'
+
+
+@lru_cache(maxsize=None)
+def compiled_template(name):
+    """Template de e-mail carregado e compilado uma única vez por processo"""
+    return get_template(name)
+
+
+@lru_cache(maxsize=4096)
+def render_assignment_card(title, course_name, due_date, days_until_due):
+    """
+    Cartão (HTML e texto) de uma atividade no e-mail de alerta
+
+    O cartão depende apenas destes valores, então alunos da mesma turma
+    compartilham o mesmo fragmento já renderizado.
+
+    Args:
+        title (str): Título da atividade
+        course_name (str): Nome da disciplina
+        due_date (date): Data de entrega
+        days_until_due (int): Dias até o vencimento
+
+    Returns:
+        Tuple[str, str]: (html, texto), já escapados
+    """
+    context = {
+        'title': title,
+        'course_name': course_name,
+        'due_date': due_date,
+        'days_until_due': days_until_due,
+    }
+    return (
+        mark_safe(compiled_template(CARD_TEMPLATE_HTML).render(context)),
+        mark_safe(compiled_template(CARD_TEMPLATE_TEXT).render(context)),
+    )
+
+
+def render_alert_email(user, assignments, cached=True):
+    """
+    Renderiza o e-mail de alerta (texto + HTML) de um usuário
+
+    Args:
+        user (CustomUser): Destinatário
+        assignments (List[Assignment]): Atividades com days_until_due
+        cached (bool): Usa templates compilados e cartões em cache; False
+            renderiza tudo do zero (usado como referência no benchmark)
+
+    Returns:
+        Dict: {'subject', 'body_text', 'body_html'}
+    """
+    render_card = render_assignment_card if cached else _render_card_uncached
+    render = _render_compiled if cached else render_to_string
+
+    cards = [
+        render_card(assignment.title, assignment.course.name, assignment.due_date, assignment.days_until_due)
+        for assignment in assignments
+    ]
+
+    context = {
+        'user': user,
+        'assignments': assignments,
+        'site_url': SITE_URL,
+        'settings_url': SETTINGS_URL,
+    }
+
+    plural = 's' if len(assignments) > 1 else ''
+    subject = f'UnaTrack: {len(assignments)} atividade{plural} próxima{plural} do vencimento'
+
+    body_html = render(ALERT_TEMPLATE_HTML, {**context, 'assignment_cards': [html for html, _ in cards]})
+    body_text = render(ALERT_TEMPLATE_TEXT, {**context, 'assignment_cards': [text for _, text in cards]})
+
+    return {
+        'subject': subject,
+        'body_text': body_text,
+        'body_html': body_html,
+    }
+
+
+def _render_compiled(name, context):
+    """Renderiza um template já compilado"""
+    return compiled_template(name).render(context)
+
+
+def _render_card_uncached(title, course_name, due_date, days_until_due):
+    """Renderiza o cartão de uma atividade sem nenhum cache"""
+    context = {
+        'title': title,
+        'course_name': course_name,
+        'due_date': due_date,
+        'days_until_due': days_until_due,
+    }
+    return (
+        mark_safe(render_to_string(CARD_TEMPLATE_HTML, context)),
+        mark_safe(render_to_string(CARD_TEMPLATE_TEXT, context)),
+    )
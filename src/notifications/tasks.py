@@ -1,11 +1,155 @@
-from celery import shared_task
-from django.core.management import call_command
+from datetime import date
+import logging
 
+from celery import chord, shared_task
+from django.conf import settings
+from django.utils import timezone
 
-@shared_task(name='notifications.send_assignment_alerts')
+from .alerts import alert_candidate_user_ids, alert_candidates, enqueue_user_alerts
+from .outbox import drain_outbox, outbox_stats, release_stale_messages
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='notifications.send_assignment_alerts', ignore_result=True)
 def send_assignment_alerts():
     """
     Task Celery para enviar alertas de atividades próximas do vencimento.
+
+    Prazos novos ou alterados já são alertados pela sincronização
+    (evaluate_user_alerts); esta varredura diária funciona como rede de
+    segurança e, em geral, encontra poucas atividades pendentes.
+
+    Divide os usuários com atividades a alertar em grupos de ALERT_CHUNK_SIZE
+    e grava os e-mails de cada grupo na fila (EmailOutbox) em uma subtarefa
+    própria, em paralelo entre os workers. Ao final, summarize_alert_run
+    consolida o resultado e aciona os workers de envio.
+    """
+    today = timezone.now().date()
+    user_ids = alert_candidate_user_ids(today)
+
+    if not user_ids:
+        logger.info("Nenhum alerta de atividade a enviar")
+        return {'success': True, 'chunks': 0, 'users_total': 0}
+
+    chunk_size = max(settings.ALERT_CHUNK_SIZE, 1)
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+    chord(
+        enqueue_alert_chunk.s(chunk, today.isoformat()) for chunk in chunks
+    )(summarize_alert_run.s(today.isoformat(), len(user_ids)))
+
+    logger.info(f"Envio de alertas dividido em {len(chunks)} subtarefas para {len(user_ids)} usuários")
+    return {'success': True, 'chunks': len(chunks), 'users_total': len(user_ids)}
+
+
+@shared_task(bind=True, name='notifications.enqueue_alert_chunk', max_retries=3)
+def enqueue_alert_chunk(self, user_ids, today):
+    """
+    Renderiza os alertas de um grupo de usuários e os grava na fila de e-mails
+
+    Em caso de falha, o grupo é reenfileirado com backoff. Mensagens já
+    gravadas não são duplicadas: suas atividades saem da consulta e a chave de
+    idempotência impede uma segunda mensagem igual.
+
+    Args:
+        user_ids (List[int]): Usuários do grupo
+        today (str): Data de referência (ISO)
+
+    Returns:
+        Dict: {'success', 'users_processed', 'messages_queued'}
+    """
+    try:
+        result = enqueue_user_alerts(date.fromisoformat(today), user_ids=user_ids)
+    except Exception as e:
+        logger.error(f"Erro no grupo de alertas ({len(user_ids)} usuários): {str(e)}")
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60 * 2 ** self.request.retries)
+
+        return {'success': False, 'error': str(e), 'users_processed': 0, 'messages_queued': 0}
+
+    return {'success': True, **result}
+
+
+@shared_task(name='notifications.summarize_alert_run')
+def summarize_alert_run(results, today, users_total):
     """
-    call_command('send_assignment_alerts')
-    return 'Alertas de atividades enviados com sucesso'
+    Consolida o resultado das subtarefas e aciona o envio da fila de e-mails
+
+    Args:
+        results (List[Dict]): Retorno de cada enqueue_alert_chunk
+        today (str): Data de referência (ISO)
+        users_total (int): Usuários com atividades a alertar
+
+    Returns:
+        Dict: Resumo do dia
+    """
+    summary = {
+        'success': all(result['success'] for result in results),
+        'date': today,
+        'chunks': len(results),
+        'chunks_failed': sum(1 for result in results if not result['success']),
+        'users_total': users_total,
+        'users_processed': sum(result['users_processed'] for result in results),
+        'messages_queued': sum(result['messages_queued'] for result in results),
+    }
+
+    logger.info(
+        f"Alertas de {today}: {summary['messages_queued']} e-mails na fila, "
+        f"{summary['chunks_failed']} de {summary['chunks']} subtarefas falharam"
+    )
+
+    dispatch_outbox_drain()
+    return summary
+
+
+@shared_task(name='notifications.evaluate_user_alerts', ignore_result=True)
+def evaluate_user_alerts(user_id, assignment_ids):
+    """
+    Avaliação incremental de alertas, disparada pela sincronização
+
+    Recebe apenas as atividades com prazo novo ou alterado. Se alguma delas já
+    está dentro da janela de alerta do usuário, o e-mail do usuário é gravado
+    na fila e enviado em seguida, sem esperar a varredura diária.
+
+    Args:
+        user_id (int): Usuário sincronizado
+        assignment_ids (List[int]): Atividades criadas ou com prazo alterado
+    """
+    today = timezone.now().date()
+
+    if not alert_candidates(today, user_id=user_id).filter(id__in=assignment_ids).exists():
+        return
+
+    result = enqueue_user_alerts(today, user_id=user_id)
+    logger.info(f"Alertas incrementais do usuário ID {user_id}: {result['messages_queued']} e-mails na fila")
+
+    if result['messages_queued']:
+        drain_email_outbox.delay()
+
+
+def dispatch_outbox_drain():
+    """Aciona ALERT_OUTBOX_WORKERS tarefas de envio em paralelo"""
+    for _ in range(max(settings.ALERT_OUTBOX_WORKERS, 1)):
+        drain_email_outbox.delay()
+
+
+@shared_task(name='notifications.drain_email_outbox', ignore_result=True)
+def drain_email_outbox():
+    """
+    Worker de envio: drena a fila de e-mails por até ALERT_OUTBOX_DRAIN_TIME segundos
+
+    Várias instâncias podem rodar ao mesmo tempo; cada uma reserva suas
+    mensagens com SKIP LOCKED. Também roda periodicamente para enviar as
+    novas tentativas agendadas.
+    """
+    release_stale_messages()
+    result = drain_outbox(time_limit=settings.ALERT_OUTBOX_DRAIN_TIME)
+
+    if any(result.values()):
+        stats = outbox_stats()
+        logger.info(
+            f"Fila de e-mails: {result['sent']} enviados, {result['retried']} reagendados, "
+            f"{result['failed']} falharam; {stats['queue_depth']} na fila, {stats['drain_rate']} e-mails/min"
+        )
@@ -0,0 +1,243 @@
+from datetime import timedelta
+from email import message_from_bytes, policy
+import socket
+
+from aiosmtpd.controller import Controller
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Assignment, Course
+from user.models import CustomUser
+from .alerts import alert_candidates
+from .models import EmailOutbox
+from .outbox import claim_messages, deliver_messages
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+def free_port():
+    """Porta TCP livre em localhost para o servidor SMTP dos testes"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """
+    Handler do aiosmtpd que guarda as mensagens recebidas e simula falhas
+
+    Args:
+        drop_on (set): Números dos comandos MAIL (1, 2, ...) em que o servidor derruba a conexão
+        refuse (set): Destinatários recusados pelo servidor
+    """
+
+    def __init__(self, drop_on=(), refuse=()):
+        self.drop_on = set(drop_on)
+        self.refuse = set(refuse)
+        self.mail_commands = 0
+        self.received = []
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        self.mail_commands += 1
+        if self.mail_commands in self.drop_on:
+            server.transport.close()
+            return '421 Closing connection'
+
+        envelope.mail_from = address
+        envelope.mail_options.extend(mail_options)
+        return '250 OK'
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refuse:
+            return '550 User unknown'
+
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append({
+            'peer': session.peer,
+            'to': list(envelope.rcpt_tos),
+            'message': message_from_bytes(envelope.content, policy=policy.default),
+        })
+        return '250 Message accepted for delivery'
+
+    @property
+    def connections(self):
+        """Conexões distintas (endereço de origem) que entregaram mensagens"""
+        return {message['peer'] for message in self.received}
+
+
+@override_settings(ALERT_OUTBOX_MAX_ATTEMPTS=5, ALERT_SEND_RATE_PER_MINUTE=0)
+class DeliverMessagesTests(TestCase):
+    """deliver_messages pelo EmailBackend SMTP do Django contra um servidor SMTP local"""
+
+    def setUp(self):
+        self.assignments = []
+
+        for i in range(3):
+            user = CustomUser.objects.create(
+                username=f'aluno{i}',
+                email=f'aluno{i}@example.com',
+                first_name=f'Aluno {i}',
+                last_name='Teste',
+            )
+            course = Course.objects.create(user=user, name='Cálculo I', instructor='Professor', link='')
+            assignment = Assignment.objects.create(user=user, course=course, title=f'Tarefa {i}')
+            message = EmailOutbox.objects.create(
+                user=user,
+                idempotency_key=f'alert:{user.id}',
+                to_email=user.email,
+                subject=f'Atividades próximas do prazo {i}',
+                body_text='Tarefa',
+            )
+            message.assignments.add(assignment)
+            self.assignments.append(assignment)
+
+        self.messages = claim_messages(limit=10)
+
+    def start_server(self, **handler_options):
+        """Inicia o servidor SMTP e aponta EMAIL_HOST/EMAIL_PORT para ele"""
+        handler = RecordingHandler(**handler_options)
+        port = free_port()
+
+        controller = Controller(handler, hostname='127.0.0.1', port=port)
+        controller.start()
+        self.addCleanup(controller.stop)
+
+        email_settings = override_settings(
+            EMAIL_BACKEND=SMTP_BACKEND,
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=port,
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+        )
+        email_settings.enable()
+        self.addCleanup(email_settings.disable)
+
+        return handler
+
+    def assertAlertSent(self, assignment, sent=True):
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.alert_sent, sent)
+
+    def test_batch_uses_a_single_connection(self):
+        server = self.start_server()
+
+        result = deliver_messages(self.messages)
+
+        self.assertEqual(result, {'sent': 3, 'retried': 0, 'failed': 0})
+        self.assertEqual(len(server.received), 3)
+        self.assertEqual(len(server.connections), 1)
+        self.assertEqual([message['to'] for message in server.received], [[m.to_email] for m in self.messages])
+        for message, received in zip(self.messages, server.received):
+            self.assertEqual(received['message']['Subject'], message.subject)
+            self.assertEqual(received['message']['X-UnaTrack-Idempotency-Key'], message.idempotency_key)
+
+        for assignment in self.assignments:
+            self.assertAlertSent(assignment)
+
+    def test_reconnects_when_server_drops_connection(self):
+        server = self.start_server(drop_on={2})
+
+        result = deliver_messages(self.messages)
+
+        self.assertEqual(result, {'sent': 3, 'retried': 0, 'failed': 0})
+        self.assertEqual([message['to'] for message in server.received], [[m.to_email] for m in self.messages])
+        self.assertEqual(len(server.connections), 2)
+        self.assertNotEqual(server.received[0]['peer'], server.received[1]['peer'])
+        self.assertEqual(server.received[1]['peer'], server.received[2]['peer'])
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENT).count(), 3)
+
+    def test_failed_message_is_retried_without_marking_others(self):
+        failing = self.messages[1]
+        server = self.start_server(refuse={failing.to_email})
+
+        result = deliver_messages(self.messages)
+
+        self.assertEqual(result, {'sent': 2, 'retried': 1, 'failed': 0})
+        self.assertEqual(
+            [message['to'] for message in server.received],
+            [[self.messages[0].to_email], [self.messages[2].to_email]],
+        )
+        self.assertEqual(len(server.connections), 1)
+
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(failing.attempts, 1)
+        self.assertIn('User unknown', failing.last_error)
+
+        self.assertAlertSent(self.assignments[0])
+        self.assertAlertSent(self.assignments[1], sent=False)
+        self.assertAlertSent(self.assignments[2])
+
+    def test_message_is_failed_after_max_attempts(self):
+        failing = self.messages[0]
+        EmailOutbox.objects.filter(id=failing.id).update(attempts=5)
+        failing.attempts = 5
+        self.start_server(refuse={failing.to_email})
+
+        result = deliver_messages(self.messages)
+
+        self.assertEqual(result, {'sent': 2, 'retried': 0, 'failed': 1})
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, EmailOutbox.STATUS_FAILED)
+        self.assertAlertSent(self.assignments[0], sent=False)
+
+
+class AlertCandidatesTests(TestCase):
+    """Uma atividade entra em no máximo um alerta por dia"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.user = CustomUser.objects.create(
+            username='aluno',
+            email='aluno@example.com',
+            first_name='Aluno',
+            last_name='Teste',
+            dias_antecedencia_alerta=3,
+        )
+        course = Course.objects.create(user=self.user, name='Cálculo I', instructor='Professor', link='')
+        self.assignment = Assignment.objects.create(
+            user=self.user,
+            course=course,
+            title='Tarefa',
+            due_date=self.today + timedelta(days=1),
+        )
+
+    def add_message(self, status, key='alert'):
+        message = EmailOutbox.objects.create(
+            user=self.user,
+            idempotency_key=key,
+            to_email=self.user.email,
+            subject='Atividades próximas do prazo',
+            body_text='Tarefa',
+            status=status,
+        )
+        message.assignments.add(self.assignment)
+        return message
+
+    def candidate_ids(self):
+        return list(alert_candidates(self.today, user_id=self.user.id).values_list('id', flat=True))
+
+    def test_pending_assignment_is_candidate(self):
+        self.assertEqual(self.candidate_ids(), [self.assignment.id])
+
+    def test_queued_message_excludes_assignment(self):
+        self.add_message(EmailOutbox.STATUS_PENDING)
+
+        self.assertEqual(self.candidate_ids(), [])
+
+    def test_message_sent_today_excludes_assignment_after_due_date_change(self):
+        # Alerta enviado pela avaliação incremental; nova sincronização alterou o prazo e limpou alert_sent
+        self.add_message(EmailOutbox.STATUS_SENT)
+
+        self.assertEqual(self.candidate_ids(), [])
+
+    def test_message_sent_on_previous_day_does_not_exclude_assignment(self):
+        message = self.add_message(EmailOutbox.STATUS_SENT)
+        EmailOutbox.objects.filter(id=message.id).update(created_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(self.candidate_ids(), [self.assignment.id])
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import SyncRun
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    """Admin do histórico de sincronizações"""
+
+    list_display = ('user', 'trigger', 'status', 'queued_at', 'fetch_duration', 'parse_duration', 'persist_duration', 'request_count', 'assignments_created', 'assignments_updated')
+    list_filter = ('status', 'trigger', 'queued_at')
+    search_fields = ('user__email', 'task_id')
+    ordering = ('-queued_at',)
+    readonly_fields = ('task_id', 'queued_at', 'started_at', 'finished_at')
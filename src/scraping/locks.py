@@ -0,0 +1,224 @@
+from datetime import timedelta
+from uuid import uuid4
+import logging
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.utils import timezone
+
+from .models import SyncRun
+
+logger = logging.getLogger(__name__)
+
+SYNC_LOCK_KEY = 'scraping:sync-lock:{user_id}'
+SYNC_COOLDOWN_KEY = 'scraping:sync-cooldown:{user_id}'
+
+# Comparação e escrita na mesma operação do Redis: o lock pode expirar e ser
+# readquirido por outra sincronização entre um GET e um DEL separados
+DELETE_IF_EQUAL_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+REPLACE_IF_EQUAL_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def request_user_sync(user_id, interactive=False):
+    """
+    Enfileira a sincronização de um usuário garantindo uma única execução por vez
+
+    Se já existe uma sincronização na fila ou em andamento para o usuário, a
+    requisição é anexada à tarefa existente em vez de iniciar outra; uma
+    requisição interativa promove para a fila interactive-sync uma sincronização
+    periódica que ainda espera na fila bulk-sync. Logo após
+    uma sincronização bem-sucedida, novas requisições são recusadas até o fim
+    do período de cooldown.
+
+    Args:
+        user_id (int): ID do usuário a sincronizar
+        interactive (bool): Sincronização solicitada pelo usuário; usa a fila
+            interactive-sync com prioridade máxima em vez da fila bulk-sync
+
+    Returns:
+        Dict: {'success', 'task_id', 'coalesced'} ou {'success', 'error', 'retry_after'}
+    """
+    from .tasks import start_sync_pipeline
+
+    cooldown_until = cache.get(SYNC_COOLDOWN_KEY.format(user_id=user_id))
+    if cooldown_until:
+        retry_after = max(int((cooldown_until - timezone.now()).total_seconds()), 1)
+        return {
+            'success': False,
+            'error': f'Sincronização realizada recentemente. Tente novamente em {retry_after} segundos.',
+            'retry_after': retry_after,
+        }
+
+    lock_key = SYNC_LOCK_KEY.format(user_id=user_id)
+
+    # Duas tentativas: o lock existente pode expirar entre o add e o get
+    for _ in range(2):
+        task_id = str(uuid4())
+
+        if cache.add(lock_key, task_id, timeout=settings.SCRAPING_SYNC_LOCK_TIMEOUT):
+            try:
+                SyncRun.objects.create(
+                    user_id=user_id,
+                    task_id=task_id,
+                    trigger=SyncRun.TRIGGER_MANUAL if interactive else SyncRun.TRIGGER_PERIODIC,
+                )
+                start_sync_pipeline(user_id, task_id, interactive=interactive)
+            except Exception:
+                cache.delete(lock_key)
+                raise
+
+            logger.info(f"Sincronização enfileirada para usuário ID {user_id}: {task_id}")
+            return {'success': True, 'task_id': task_id, 'coalesced': False}
+
+        existing_task_id = cache.get(lock_key)
+        if existing_task_id:
+            if interactive:
+                existing_task_id = _promote_queued_sync(user_id, existing_task_id) or existing_task_id
+
+            logger.info(f"Sincronização já em andamento para usuário ID {user_id}: {existing_task_id}")
+            return {'success': True, 'task_id': existing_task_id, 'coalesced': True}
+
+    return {
+        'success': False,
+        'error': 'Não foi possível iniciar a sincronização. Tente novamente.',
+        'retry_after': 1,
+    }
+
+
+def release_sync_lock(user_id, task_id, succeeded):
+    """
+    Libera o lock de sincronização do usuário e inicia o cooldown em caso de sucesso
+
+    Args:
+        user_id (int): ID do usuário sincronizado
+        task_id (str): ID da tarefa que detém o lock
+        succeeded (bool): Se a sincronização terminou com sucesso
+    """
+    # Só remove o lock se ele ainda pertence a esta tarefa
+    _delete_if_equal(SYNC_LOCK_KEY.format(user_id=user_id), task_id)
+
+    cooldown = settings.SCRAPING_SYNC_COOLDOWN
+    if succeeded and cooldown > 0:
+        cache.set(
+            SYNC_COOLDOWN_KEY.format(user_id=user_id),
+            timezone.now() + timedelta(seconds=cooldown),
+            timeout=cooldown,
+        )
+
+
+def _promote_queued_sync(user_id, task_id):
+    """
+    Substitui uma sincronização periódica ainda na fila por um pipeline interativo
+
+    A sincronização da varredura horária espera em bulk-sync atrás das dos
+    demais usuários. O SyncRun e o lock passam para um novo task_id, enfileirado
+    em interactive-sync com prioridade máxima, e o fetch antigo é revogado (se
+    ainda assim chegar a um worker, fetch_user_pages o descarta, pois nenhum
+    SyncRun na fila tem mais o task_id antigo).
+
+    Args:
+        user_id (int): ID do usuário
+        task_id (str): ID da sincronização que detém o lock
+
+    Returns:
+        str: task_id do novo pipeline, ou None se a sincronização já começou
+    """
+    from .tasks import revoke_sync_pipeline, start_sync_pipeline
+
+    new_task_id = str(uuid4())
+    lock_key = SYNC_LOCK_KEY.format(user_id=user_id)
+
+    promoted = SyncRun.objects.filter(
+        task_id=task_id,
+        status=SyncRun.STATUS_QUEUED,
+        trigger=SyncRun.TRIGGER_PERIODIC,
+    ).update(task_id=new_task_id, trigger=SyncRun.TRIGGER_MANUAL)
+    if not promoted:
+        return None
+
+    if not _replace_if_equal(lock_key, task_id, new_task_id, settings.SCRAPING_SYNC_LOCK_TIMEOUT):
+        # O lock expirou nesse meio tempo: a sincronização segue como estava
+        SyncRun.objects.filter(task_id=new_task_id).update(task_id=task_id, trigger=SyncRun.TRIGGER_PERIODIC)
+        return None
+
+    revoke_sync_pipeline(task_id)
+    try:
+        start_sync_pipeline(user_id, new_task_id, interactive=True)
+    except Exception:
+        SyncRun.objects.filter(task_id=new_task_id).update(
+            status=SyncRun.STATUS_FAILED,
+            error='Falha ao enfileirar a sincronização',
+            finished_at=timezone.now(),
+        )
+        _delete_if_equal(lock_key, new_task_id)
+        raise
+
+    logger.info(f"Sincronização periódica {task_id} promovida para interativa: {new_task_id}")
+    return new_task_id
+
+
+def _replace_if_equal(key, expected, value, timeout):
+    """
+    Troca o valor da chave do cache apenas se ela ainda contém expected, atomicamente
+
+    Returns:
+        bool: True se o valor foi trocado
+    """
+    backend = caches['default']
+
+    if isinstance(backend, RedisCache):
+        client = backend._cache.get_client(key, write=True)
+        serializer = backend._cache._serializer
+        replaced = client.eval(
+            REPLACE_IF_EQUAL_SCRIPT,
+            1,
+            backend.make_and_validate_key(key),
+            serializer.dumps(expected),
+            serializer.dumps(value),
+            timeout,
+        )
+        return bool(replaced)
+
+    # Outros backends (cache local dos testes) atendem um único processo
+    if backend.get(key) == expected:
+        backend.set(key, value, timeout=timeout)
+        return True
+    return False
+
+
+def _delete_if_equal(key, value):
+    """
+    Remove a chave do cache apenas se ela ainda contém value, atomicamente
+
+    Returns:
+        bool: True se a chave foi removida
+    """
+    backend = caches['default']
+
+    if isinstance(backend, RedisCache):
+        client = backend._cache.get_client(key, write=True)
+        deleted = client.eval(
+            DELETE_IF_EQUAL_SCRIPT,
+            1,
+            backend.make_and_validate_key(key),
+            backend._cache._serializer.dumps(value),
+        )
+        return bool(deleted)
+
+    # Outros backends (cache local dos testes) atendem um único processo
+    if backend.get(key) == value:
+        backend.delete(key)
+        return True
+    return False
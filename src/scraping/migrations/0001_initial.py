@@ -0,0 +1,47 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255, unique=True, verbose_name='ID da Tarefa')),
+                ('trigger', models.CharField(choices=[('manual', 'Manual'), ('periodic', 'Periódica')], max_length=20, verbose_name='Origem')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Em andamento'), ('success', 'Concluída'), ('partial', 'Parcial'), ('failed', 'Falhou')], default='queued', max_length=20, verbose_name='Status')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Erro')),
+                ('queued_at', models.DateTimeField(auto_now_add=True, verbose_name='Enfileirada em')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizada em')),
+                ('fetch_duration', models.FloatField(blank=True, null=True, verbose_name='Duração do Download (s)')),
+                ('parse_duration', models.FloatField(blank=True, null=True, verbose_name='Duração do Parsing (s)')),
+                ('persist_duration', models.FloatField(blank=True, null=True, verbose_name='Duração da Gravação (s)')),
+                ('request_count', models.PositiveIntegerField(default=0, verbose_name='Requisições ao Portal')),
+                ('courses_found', models.PositiveIntegerField(default=0, verbose_name='Disciplinas Encontradas')),
+                ('assignments_found', models.PositiveIntegerField(default=0, verbose_name='Atividades Encontradas')),
+                ('courses_created', models.PositiveIntegerField(default=0, verbose_name='Disciplinas Criadas')),
+                ('assignments_created', models.PositiveIntegerField(default=0, verbose_name='Atividades Criadas')),
+                ('assignments_updated', models.PositiveIntegerField(default=0, verbose_name='Atividades Atualizadas')),
+                ('pending_courses', models.PositiveIntegerField(default=0, verbose_name='Disciplinas Pendentes')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_runs', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Sincronização',
+                'verbose_name_plural': 'Sincronizações',
+                'ordering': ['-queued_at'],
+                'indexes': [models.Index(fields=['user', '-queued_at'], name='syncrun_user_queued_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import models
+from django.conf import settings
+
+
+class SyncRun(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_PARTIAL = 'partial'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Na fila'),
+        (STATUS_RUNNING, 'Em andamento'),
+        (STATUS_SUCCESS, 'Concluída'),
+        (STATUS_PARTIAL, 'Parcial'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+
+    TRIGGER_MANUAL = 'manual'
+    TRIGGER_PERIODIC = 'periodic'
+
+    TRIGGER_CHOICES = [
+        (TRIGGER_MANUAL, 'Manual'),
+        (TRIGGER_PERIODIC, 'Periódica'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_runs', verbose_name='Usuário')
+    task_id = models.CharField(max_length=255, unique=True, verbose_name='ID da Tarefa')
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES, verbose_name='Origem')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name='Status')
+    error = models.TextField(blank=True, default='', verbose_name='Erro')
+
+    queued_at = models.DateTimeField(auto_now_add=True, verbose_name='Enfileirada em')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Iniciada em')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Finalizada em')
+
+    fetch_duration = models.FloatField(null=True, blank=True, verbose_name='Duração do Download (s)')
+    parse_duration = models.FloatField(null=True, blank=True, verbose_name='Duração do Parsing (s)')
+    persist_duration = models.FloatField(null=True, blank=True, verbose_name='Duração da Gravação (s)')
+
+    request_count = models.PositiveIntegerField(default=0, verbose_name='Requisições ao Portal')
+    courses_found = models.PositiveIntegerField(default=0, verbose_name='Disciplinas Encontradas')
+    assignments_found = models.PositiveIntegerField(default=0, verbose_name='Atividades Encontradas')
+    courses_created = models.PositiveIntegerField(default=0, verbose_name='Disciplinas Criadas')
+    assignments_created = models.PositiveIntegerField(default=0, verbose_name='Atividades Criadas')
+    assignments_updated = models.PositiveIntegerField(default=0, verbose_name='Atividades Atualizadas')
+    pending_courses = models.PositiveIntegerField(default=0, verbose_name='Disciplinas Pendentes')
+
+    class Meta:
+        ordering = ['-queued_at']
+        indexes = [
+            models.Index(fields=['user', '-queued_at'], name='syncrun_user_queued_idx'),
+        ]
+        verbose_name = 'Sincronização'
+        verbose_name_plural = 'Sincronizações'
+
+    def __str__(self):
+        return f"Sincronização {self.get_status_display()} - {self.user.email} ({self.queued_at:%d/%m/%Y %H:%M})"
+
+    @property
+    def total_duration(self):
+        """Duração total das etapas em segundos"""
+        durations = [self.fetch_duration, self.parse_duration, self.persist_duration]
+        return sum(d for d in durations if d is not None)
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import logging
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_CHANNEL = 'scraping:progress:{task_id}'
+PROGRESS_LAST_KEY = 'scraping:progress-last:{task_id}'
+
+# Fases que encerram a sincronização (o stream é fechado em seguida)
+FINAL_PHASES = ('done', 'failed')
+
+# Intervalo (segundos) entre comentários de keepalive no stream SSE
+KEEPALIVE_INTERVAL = 15
+
+_client = None
+
+
+def _redis():
+    """Cliente Redis síncrono compartilhado pelo processo (pool de conexões)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.SCRAPING_PROGRESS_REDIS_URL)
+    return _client
+
+
+def publish_progress(task_id, phase, **data):
+    """
+    Publica um evento de progresso de uma sincronização
+
+    O último evento também fica gravado, para que um navegador que conecte
+    (ou reconecte) no meio da sincronização veja o estado atual. Falhas no
+    Redis são apenas registradas: o progresso nunca interrompe a sincronização.
+
+    Args:
+        task_id (str): ID da sincronização (SyncRun.task_id)
+        phase (str): Fase atual (login, fetch, parse, persist, done, failed)
+        **data: Contadores da fase (courses_done, courses_total, assignments_found, ...)
+    """
+    if not task_id:
+        return
+
+    event = json.dumps({'phase': phase, **data}, default=str)
+
+    try:
+        pipe = _redis().pipeline()
+        pipe.set(PROGRESS_LAST_KEY.format(task_id=task_id), event, ex=settings.SCRAPING_SYNC_LOCK_TIMEOUT)
+        pipe.publish(PROGRESS_CHANNEL.format(task_id=task_id), event)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Erro ao publicar progresso da sincronização {task_id}: {str(e)}")
+
+
+async def progress_events(task_id, timeout=None):
+    """
+    Eventos de progresso de uma sincronização, à medida que são publicados
+
+    Começa pelo último evento gravado e termina no evento final (done/failed)
+    ou ao atingir o timeout. Produz None a cada KEEPALIVE_INTERVAL segundos
+    sem eventos, para o chamador manter a conexão viva.
+
+    Args:
+        task_id (str): ID da sincronização
+        timeout (float): Duração máxima em segundos (padrão: SCRAPING_PROGRESS_STREAM_TIMEOUT)
+
+    Yields:
+        str: Evento em JSON, ou None (keepalive)
+    """
+    timeout = timeout or settings.SCRAPING_PROGRESS_STREAM_TIMEOUT
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    client = aioredis.Redis.from_url(settings.SCRAPING_PROGRESS_REDIS_URL)
+    pubsub = client.pubsub()
+
+    try:
+        # Inscreve antes de ler o último evento, para não perder nada entre os dois
+        await pubsub.subscribe(PROGRESS_CHANNEL.format(task_id=task_id))
+
+        last = await client.get(PROGRESS_LAST_KEY.format(task_id=task_id))
+        if last:
+            last = last.decode()
+            yield last
+            if json.loads(last)['phase'] in FINAL_PHASES:
+                return
+
+        while loop.time() < deadline:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=min(KEEPALIVE_INTERVAL, max(deadline - loop.time(), 0)),
+            )
+            if message is None:
+                yield None
+                continue
+
+            event = message['data'].decode()
+            yield event
+            if json.loads(event)['phase'] in FINAL_PHASES:
+                return
+    finally:
+        await pubsub.close()
+        await client.close()
@@ -1,32 +1,156 @@
-from celery import shared_task
+from celery import shared_task, chain
+from celery.exceptions import Ignore
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
+from datetime import date
+import time
 from core.models import Course, Assignment
 from user.models import UnaerpCredentials
-from .unaerp_scraper import UnaerpScraper, CredentialsManager
+from .unaerp_scraper import UnaerpScraper, CredentialsManager, decompress_page
+from .locks import request_user_sync, release_sync_lock
+from .progress import publish_progress
+from .models import SyncRun
+from notifications.tasks import evaluate_user_alerts
+from core.cache import bump_data_version
+from core.counters import refresh_course_counters
 import logging
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-@shared_task(bind=True)
-def scrape_user_data(self, user_id):
+def start_sync_pipeline(user_id, task_id, interactive=False):
+    """
+    Enfileira o pipeline de sincronização de um usuário: fetch -> parse -> persist
+
+    Cada etapa roda em sua própria fila/pool de workers (I/O, CPU e banco).
+    task_id é atribuído à última etapa, cujo resultado é consultado pela interface.
+    Se uma etapa levantar uma exceção, sync_pipeline_failed encerra a sincronização.
+
+    Args:
+        user_id (int): ID do usuário a sincronizar
+        task_id (str): ID da tarefa final (persistência)
+        interactive (bool): Usa a fila interactive-sync e prioridade máxima
+    """
+    priority = settings.SYNC_PRIORITY_INTERACTIVE if interactive else settings.SYNC_PRIORITY_BULK
+
+    pipeline = chain(
+        fetch_user_pages.s(user_id, task_id).set(
+            task_id=fetch_task_id(task_id),
+            queue='interactive-sync' if interactive else 'bulk-sync',
+            priority=priority,
+        ),
+        parse_user_pages.s().set(queue='sync-parse', priority=priority),
+        persist_user_data.s().set(queue='sync-persist', priority=priority),
+    )
+    pipeline.on_error(sync_pipeline_failed.s(user_id, task_id))
+    return pipeline.apply_async(task_id=task_id)
+
+
+def fetch_task_id(task_id):
+    """ID da primeira etapa (fetch) do pipeline da sincronização task_id"""
+    return f'{task_id}-fetch'
+
+
+def revoke_sync_pipeline(task_id):
+    """
+    Revoga a etapa de fetch de um pipeline que ainda não começou
+
+    Args:
+        task_id (str): ID da sincronização (SyncRun.task_id)
+    """
+    fetch_user_pages.app.control.revoke(fetch_task_id(task_id))
+
+
+@shared_task(ignore_result=True)
+def sync_pipeline_failed(request, exc, traceback, user_id, sync_task_id):
+    """
+    Errback do pipeline: uma etapa falhou com uma exceção não tratada
+
+    Sem ele persist_user_data não roda, o lock ficaria preso até expirar e o
+    SyncRun continuaria 'na fila' ou 'em andamento'. Se a própria gravação já
+    encerrou a sincronização, nada é alterado além do lock.
+
+    Args:
+        request: Request da tarefa que falhou
+        exc (Exception): Exceção levantada
+        traceback (str): Traceback da exceção
+        user_id (int): ID do usuário sincronizado
+        sync_task_id (str): ID da sincronização (SyncRun.task_id)
+    """
+    logger.error(f"Pipeline de sincronização {sync_task_id} falhou em {request.task}: {exc!r}")
+
+    error = f'Erro inesperado: {exc}'
+    try:
+        finished = SyncRun.objects.filter(task_id=sync_task_id, finished_at__isnull=True).update(
+            status=SyncRun.STATUS_FAILED,
+            error=error,
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.error(f"Erro ao registrar falha da sincronização {sync_task_id}: {str(e)}")
+        finished = 0
+
+    if finished:
+        publish_progress(sync_task_id, 'failed', result={'success': False, 'error': error})
+
+    release_sync_lock(user_id, sync_task_id, succeeded=False)
+
+
+@shared_task(ignore_result=True)
+def fetch_user_pages(user_id, sync_task_id):
+    """
+    Etapa 1: login no portal e download das páginas (I/O)
+
+    As páginas das atividades seguem compactadas para a etapa de parsing.
+    O crawl respeita SCRAPING_SYNC_TIME_BUDGET: ao esgotar o tempo, seguem as
+    disciplinas concluídas e as atividades já extraídas da interrompida; as demais
+    ficam pendentes para a próxima execução, com a interrompida por último.
+
+    Args:
+        user_id (int): ID do usuário para fazer scraping
+        sync_task_id (str): ID da sincronização (SyncRun.task_id)
+    """
+    started_run = SyncRun.objects.filter(task_id=sync_task_id, status=SyncRun.STATUS_QUEUED).update(
+        status=SyncRun.STATUS_RUNNING,
+        started_at=timezone.now(),
+    )
+    if not started_run:
+        # Sincronização promovida para a fila interativa (locks.request_user_sync):
+        # o SyncRun agora pertence a outro pipeline
+        logger.info(f"Pipeline {sync_task_id} substituído, etapa de fetch descartada")
+        raise Ignore()
+
+    started = time.monotonic()
+    payload = _fetch_user_pages(user_id, sync_task_id)
+    payload['sync_task_id'] = sync_task_id
+    payload['stats'] = {
+        'fetch_duration': time.monotonic() - started,
+        'request_count': payload.pop('request_count', 0),
+    }
+    return payload
+
+
+def _fetch_user_pages(user_id, sync_task_id=None):
     """
-    Tarefa assíncrona para fazer scraping dos dados de um usuário específico
+    Faz login e crawl do portal, retornando as disciplinas e páginas das atividades
 
     Args:
         user_id (int): ID do usuário para fazer scraping
+        sync_task_id (str): ID da sincronização, usado para publicar o progresso
     """
     try:
         # Buscar usuário
-        user = User.objects.get(id=user_id)
+        user = User.objects.select_related('unaerp_credentials').get(id=user_id)
 
         # Verificar se o usuário tem credenciais UNAERP
         if not hasattr(user, 'unaerp_credentials'):
             logger.error(f"Usuário {user.email} não possui credenciais UNAERP")
             return {
                 'success': False,
+                'user_id': user_id,
                 'error': 'Credenciais UNAERP não encontradas'
             }
 
@@ -39,66 +163,307 @@ def scrape_user_data(self, user_id):
             logger.error(f"Erro ao descriptografar senha para usuário {user.email}: {str(e)}")
             return {
                 'success': False,
+                'user_id': user_id,
                 'error': 'Erro ao acessar credenciais'
             }
 
-        # Inicializar scraper
-        scraper = UnaerpScraper(credentials.ra, decrypted_password)
-
-        # Executar scraping
-        scraping_result = scraper.scrape_all_data()
+        # Executar crawl sem analisar as páginas das atividades
+        scraper = UnaerpScraper(
+            credentials.ra,
+            decrypted_password,
+            defer_parsing=True,
+            deadline=time.monotonic() + settings.SCRAPING_SYNC_TIME_BUDGET,
+            progress=lambda phase, **data: publish_progress(sync_task_id, phase, **data),
+        )
+        try:
+            scraping_result = scraper.scrape_all_data(priority_links=credentials.pending_courses)
+        finally:
+            scraper.close()
 
         if not scraping_result['success']:
             logger.error(f"Falha no scraping para usuário {user.email}: {scraping_result.get('error', 'Erro desconhecido')}")
-            return scraping_result
+            return {
+                'success': False,
+                'user_id': user_id,
+                'request_count': scraper.request_count,
+                'error': scraping_result.get('error') or 'Erro desconhecido'
+            }
+
+        return {
+            'success': True,
+            'user_id': user_id,
+            'request_count': scraper.request_count,
+            'pending_courses': scraping_result['pending_courses'],
+            'courses': [
+                {
+                    'name': course['name'],
+                    'instructor': course.get('instructor', ''),
+                    'assignments': [
+                        {
+                            'title': assignment['title'],
+                            'url': assignment['url'],
+                            'page': assignment.get('page'),
+                        }
+                        for assignment in course.get('assignments', [])
+                    ],
+                }
+                for course in scraping_result['courses']
+            ],
+        }
+
+    except User.DoesNotExist:
+        logger.error(f"Usuário com ID {user_id} não encontrado")
+        return {
+            'success': False,
+            'user_id': user_id,
+            'error': 'Usuário não encontrado'
+        }
+    except Exception as e:
+        logger.error(f"Erro inesperado no scraping para usuário ID {user_id}: {str(e)}")
+        return {
+            'success': False,
+            'user_id': user_id,
+            'error': f'Erro inesperado: {str(e)}'
+        }
+
+
+@shared_task(ignore_result=True)
+def parse_user_pages(payload):
+    """
+    Etapa 2: extrai as datas de vencimento das páginas baixadas (CPU)
+
+    Retorna apenas registros compactos (título e data ISO) por disciplina.
+
+    Args:
+        payload (dict): Resultado de fetch_user_pages
+    """
+    if not payload['success']:
+        return payload
+
+    user_id = payload['user_id']
+    started = time.monotonic()
+
+    publish_progress(
+        payload.get('sync_task_id'),
+        'parse',
+        courses_total=len(payload['courses']),
+        assignments_found=sum(len(course['assignments']) for course in payload['courses']),
+    )
+
+    try:
+        courses = []
+
+        for course_data in payload['courses']:
+            assignments = []
+
+            for assignment_data in course_data['assignments']:
+                due_date = None
+
+                if assignment_data.get('page'):
+                    try:
+                        due_date = UnaerpScraper.extract_due_date_from_page(
+                            decompress_page(assignment_data['page']),
+                            assignment_data['url'],
+                        )
+                    except Exception as e:
+                        logger.error(f"Erro ao extrair data da atividade {assignment_data['url']}: {e}")
+
+                assignments.append({
+                    'title': assignment_data['title'],
+                    'due_date': due_date.isoformat() if due_date else None,
+                })
+
+            courses.append({
+                'name': course_data['name'],
+                'instructor': course_data['instructor'],
+                'assignments': assignments,
+            })
+
+        return {
+            'success': True,
+            'user_id': user_id,
+            'pending_courses': payload['pending_courses'],
+            'courses': courses,
+            'stats': dict(payload['stats'], parse_duration=time.monotonic() - started),
+        }
+
+    except Exception as e:
+        logger.error(f"Erro inesperado no parsing para usuário ID {user_id}: {str(e)}")
+        return {
+            'success': False,
+            'user_id': user_id,
+            'error': f'Erro inesperado: {str(e)}',
+            'stats': payload['stats'],
+        }
+
+
+@shared_task(bind=True)
+def persist_user_data(self, payload):
+    """
+    Etapa 3: grava disciplinas e atividades no banco e libera o lock de sincronização
+
+    Sincronizações parciais (tempo esgotado) não iniciam o cooldown, para que as
+    disciplinas pendentes possam ser retomadas logo.
+
+    Args:
+        payload (dict): Resultado de parse_user_pages
+    """
+    user_id = payload['user_id']
+    stats = payload.get('stats', {})
+    result = {'success': False, 'error': payload.get('error', 'Erro inesperado')}
+    started = time.monotonic()
+    try:
+        if payload['success']:
+            publish_progress(self.request.id, 'persist', courses_total=len(payload['courses']))
+            result = _persist_user_data(user_id, payload['courses'], payload['pending_courses'])
+        return result
+    finally:
+        _finish_sync_run(self.request.id, result, stats, persist_duration=time.monotonic() - started)
+        publish_progress(self.request.id, 'done' if result.get('success') else 'failed', result=result)
+        release_sync_lock(
+            user_id,
+            self.request.id,
+            succeeded=result.get('success', False) and not result.get('partial', False),
+        )
+
+
+def _finish_sync_run(sync_task_id, result, stats, persist_duration):
+    """
+    Registra o resultado e as métricas da sincronização no histórico (SyncRun)
+
+    Args:
+        sync_task_id (str): ID da sincronização (SyncRun.task_id)
+        result (dict): Resultado final do pipeline
+        stats (dict): Métricas acumuladas pelas etapas anteriores
+        persist_duration (float): Duração da etapa de gravação em segundos
+    """
+    if not result.get('success'):
+        status = SyncRun.STATUS_FAILED
+    elif result.get('partial'):
+        status = SyncRun.STATUS_PARTIAL
+    else:
+        status = SyncRun.STATUS_SUCCESS
+
+    try:
+        SyncRun.objects.filter(task_id=sync_task_id).update(
+            status=status,
+            error=result.get('error') or '',
+            finished_at=timezone.now(),
+            fetch_duration=stats.get('fetch_duration'),
+            parse_duration=stats.get('parse_duration'),
+            persist_duration=persist_duration,
+            request_count=stats.get('request_count', 0),
+            courses_found=result.get('total_courses', 0),
+            assignments_found=result.get('total_assignments', 0),
+            courses_created=result.get('courses_created', 0),
+            assignments_created=result.get('assignments_created', 0),
+            assignments_updated=result.get('assignments_updated', 0),
+            pending_courses=result.get('pending_courses', 0),
+        )
+    except Exception as e:
+        logger.error(f"Erro ao registrar sincronização {sync_task_id}: {str(e)}")
+
+
+def _persist_user_data(user_id, courses, pending_courses):
+    """
+    Cria disciplinas e atividades novas a partir dos registros extraídos
+
+    Args:
+        user_id (int): ID do usuário sincronizado
+        courses (list): Disciplinas concluídas com suas atividades (título e data ISO)
+        pending_courses (list): Links das disciplinas não processadas nesta execução
+    """
+    try:
+        user = User.objects.select_related('unaerp_credentials').get(id=user_id)
 
         # Processar dados extraídos
         courses_created = 0
         assignments_created = 0
+        assignments_updated = 0
+        total_assignments = 0
 
-        for course_data in scraping_result['courses']:
-            # Criar ou atualizar disciplina
-            course, created = Course.objects.get_or_create(
-                user=user,
-                name=course_data['name'],
-                defaults={
-                    'instructor': course_data.get('instructor', ''),
-                }
-            )
-
-            if created:
-                courses_created += 1
-                logger.info(f"Disciplina criada: {course.name} para usuário {user.email}")
+        # Atividades com data de entrega nova ou alterada nesta sincronização
+        changed_assignment_ids = []
+        course_ids = []
 
-            # Processar atividades da disciplina
-            for assignment_data in course_data.get('assignments', []):
-                assignment, created = Assignment.objects.get_or_create(
+        with transaction.atomic():
+            for course_data in courses:
+                # Criar ou atualizar disciplina
+                course, created = Course.objects.get_or_create(
                     user=user,
-                    course=course,
-                    title=assignment_data['title'],
+                    name=course_data['name'],
                     defaults={
-                        'due_date': assignment_data.get('due_date'),
-                        'completed': False,
+                        'instructor': course_data.get('instructor', ''),
                     }
                 )
 
                 if created:
-                    assignments_created += 1
-                    logger.info(f"Atividade criada: {assignment.title} para disciplina {course.name}")
+                    courses_created += 1
+                    logger.info(f"Disciplina criada: {course.name} para usuário {user.email}")
+
+                course_ids.append(course.id)
+
+                # Processar atividades da disciplina
+                for assignment_data in course_data.get('assignments', []):
+                    total_assignments += 1
+                    due_date = assignment_data.get('due_date')
+                    due_date = date.fromisoformat(due_date) if due_date else None
+
+                    assignment, created = Assignment.objects.get_or_create(
+                        user=user,
+                        course=course,
+                        title=assignment_data['title'],
+                        defaults={
+                            'due_date': due_date,
+                            'completed': False,
+                        }
+                    )
+
+                    if created:
+                        assignments_created += 1
+                        logger.info(f"Atividade criada: {assignment.title} para disciplina {course.name}")
+                        if due_date:
+                            changed_assignment_ids.append(assignment.id)
+
+                    elif due_date and assignment.due_date != due_date:
+                        # Prazo alterado no portal: o alerta enviado para a data antiga não vale mais
+                        Assignment.objects.filter(id=assignment.id).update(
+                            due_date=due_date,
+                            alert_sent=False,
+                            alert_sent_at=None,
+                        )
+                        assignments_updated += 1
+                        changed_assignment_ids.append(assignment.id)
+                        logger.info(f"Prazo alterado: {assignment.title} ({assignment.due_date} -> {due_date})")
 
-        # Atualizar timestamp do último scraping
-        credentials.last_sync = timezone.now()
-        credentials.save()
+            # Contadores das disciplinas sincronizadas, na mesma transação das atividades
+            refresh_course_counters(course_ids)
 
-        # Fechar scraper
-        scraper.close()
+            # Atualizar timestamp do último scraping e disciplinas a retomar
+            credentials = user.unaerp_credentials
+            credentials.last_sync = timezone.now()
+            credentials.pending_courses = pending_courses
+            credentials.save()
+
+            # Estatísticas em cache ficam obsoletas assim que os dados forem gravados
+            transaction.on_commit(lambda: bump_data_version(user_id))
+
+            # Avaliar os alertas das atividades alteradas assim que os dados forem gravados,
+            # sem esperar a varredura diária
+            if changed_assignment_ids:
+                transaction.on_commit(
+                    lambda: evaluate_user_alerts.delay(user_id, changed_assignment_ids)
+                )
 
         result = {
             'success': True,
+            'partial': bool(pending_courses),
+            'pending_courses': len(pending_courses),
             'courses_created': courses_created,
             'assignments_created': assignments_created,
-            'total_courses': len(scraping_result['courses']),
-            'total_assignments': scraping_result['assignments_count']
+            'assignments_updated': assignments_updated,
+            'total_courses': len(courses),
+            'total_assignments': total_assignments
         }
 
         logger.info(f"Scraping concluído para usuário {user.email}: {result}")
@@ -111,40 +476,41 @@ def scrape_user_data(self, user_id):
             'error': 'Usuário não encontrado'
         }
     except Exception as e:
-        logger.error(f"Erro inesperado no scraping para usuário ID {user_id}: {str(e)}")
+        logger.error(f"Erro inesperado ao salvar dados do usuário ID {user_id}: {str(e)}")
         return {
             'success': False,
             'error': f'Erro inesperado: {str(e)}'
         }
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def scrape_all_users():
     """
     Tarefa assíncrona para fazer scraping de todos os usuários com credenciais UNAERP
+
+    O histórico de cada sincronização fica em SyncRun; o retorno traz apenas contadores.
     """
     try:
         # Buscar todos os usuários com credenciais UNAERP
         users_with_credentials = User.objects.filter(unaerp_credentials__isnull=False)
 
-        results = []
+        users_processed = 0
 
-        for user in users_with_credentials:
+        for user in users_with_credentials.only('id', 'email'):
             logger.info(f"Iniciando scraping para usuário {user.email}")
 
-            # Executar scraping para o usuário
-            result = scrape_user_data.delay(user.id)
-            results.append({
-                'user_id': user.id,
-                'user_email': user.email,
-                'task_id': result.id
-            })
+            # Enfileirar scraping (ignora usuários já em sincronização ou em cooldown)
+            result = request_user_sync(user.id)
+            if not result['success']:
+                logger.info(f"Scraping ignorado para usuário {user.email}: {result['error']}")
+                continue
+
+            users_processed += 1
 
-        logger.info(f"Scraping iniciado para {len(results)} usuários")
+        logger.info(f"Scraping iniciado para {users_processed} usuários")
         return {
             'success': True,
-            'users_processed': len(results),
-            'tasks': results
+            'users_processed': users_processed,
         }
 
     except Exception as e:
@@ -155,7 +521,7 @@ def scrape_all_users():
         }
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def periodic_scraping():
     """
     Tarefa periódica para executar scraping automaticamente
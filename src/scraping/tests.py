@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from user.models import CustomUser
+from .locks import SYNC_LOCK_KEY, request_user_sync
+from .models import SyncRun
+
+
+@mock.patch('scraping.tasks.revoke_sync_pipeline')
+@mock.patch('scraping.tasks.start_sync_pipeline')
+class RequestUserSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(
+            username='aluno',
+            email='aluno@example.com',
+            first_name='Aluno',
+            last_name='Teste',
+        )
+        self.lock_key = SYNC_LOCK_KEY.format(user_id=self.user.id)
+
+    def test_first_request_starts_pipeline(self, start_sync_pipeline, revoke_sync_pipeline):
+        result = request_user_sync(self.user.id, interactive=True)
+
+        self.assertTrue(result['success'])
+        self.assertFalse(result['coalesced'])
+        self.assertEqual(cache.get(self.lock_key), result['task_id'])
+        start_sync_pipeline.assert_called_once_with(self.user.id, result['task_id'], interactive=True)
+
+        run = SyncRun.objects.get(task_id=result['task_id'])
+        self.assertEqual(run.trigger, SyncRun.TRIGGER_MANUAL)
+
+    def test_bulk_request_joins_running_sync(self, start_sync_pipeline, revoke_sync_pipeline):
+        first = request_user_sync(self.user.id)
+        start_sync_pipeline.reset_mock()
+
+        result = request_user_sync(self.user.id)
+
+        self.assertTrue(result['coalesced'])
+        self.assertEqual(result['task_id'], first['task_id'])
+        start_sync_pipeline.assert_not_called()
+
+    def test_interactive_request_promotes_queued_bulk_sync(self, start_sync_pipeline, revoke_sync_pipeline):
+        bulk = request_user_sync(self.user.id)
+        start_sync_pipeline.reset_mock()
+
+        result = request_user_sync(self.user.id, interactive=True)
+
+        self.assertTrue(result['success'])
+        self.assertTrue(result['coalesced'])
+        self.assertNotEqual(result['task_id'], bulk['task_id'])
+        self.assertEqual(cache.get(self.lock_key), result['task_id'])
+
+        revoke_sync_pipeline.assert_called_once_with(bulk['task_id'])
+        start_sync_pipeline.assert_called_once_with(self.user.id, result['task_id'], interactive=True)
+
+        run = SyncRun.objects.get(user=self.user)
+        self.assertEqual(run.task_id, result['task_id'])
+        self.assertEqual(run.trigger, SyncRun.TRIGGER_MANUAL)
+        self.assertEqual(run.status, SyncRun.STATUS_QUEUED)
+
+    def test_interactive_request_joins_bulk_sync_already_running(self, start_sync_pipeline, revoke_sync_pipeline):
+        bulk = request_user_sync(self.user.id)
+        SyncRun.objects.filter(task_id=bulk['task_id']).update(status=SyncRun.STATUS_RUNNING)
+        start_sync_pipeline.reset_mock()
+
+        result = request_user_sync(self.user.id, interactive=True)
+
+        self.assertTrue(result['coalesced'])
+        self.assertEqual(result['task_id'], bulk['task_id'])
+        self.assertEqual(cache.get(self.lock_key), bulk['task_id'])
+        revoke_sync_pipeline.assert_not_called()
+        start_sync_pipeline.assert_not_called()
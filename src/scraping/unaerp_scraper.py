@@ -1,16 +1,47 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+import zlib
+import base64
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from urllib.parse import urljoin
 import logging
+import time
 from cryptography.fernet import Fernet
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
 
+class SyncBudgetExceeded(Exception):
+    """
+    O tempo disponível para a sincronização se esgotou
+
+    Attributes:
+        assignments (List[Dict]): Atividades já extraídas da disciplina
+            interrompida, acumuladas enquanto a exceção sobe
+    """
+
+    def __init__(self, assignments: Optional[List[Dict]] = None):
+        super().__init__()
+        self.assignments = assignments or []
+
+
+def compress_page(content: bytes) -> str:
+    """
+    Compacta o HTML de uma página para trafegar entre etapas do pipeline (JSON)
+    """
+    return base64.b64encode(zlib.compress(content)).decode('ascii')
+
+
+def decompress_page(data: str) -> bytes:
+    """
+    Reverte compress_page
+    """
+    return zlib.decompress(base64.b64decode(data))
+
+
 class UnaerpScraper:
     """
     Scraper para o sistema UNAERP
@@ -20,21 +51,43 @@ class UnaerpScraper:
     LOGIN_URL = f"{BASE_URL}/login/index.php"
     DASHBOARD_URL = f"{BASE_URL}/my/"
 
-    def __init__(self, ra: str, password: str):
+    def __init__(self, ra: str, password: str, defer_parsing: bool = False, deadline: Optional[float] = None,
+                 progress: Optional[Callable[..., None]] = None):
         """
         Inicializa o scraper com as credenciais do usuário
 
         Args:
             ra (str): RA do estudante (usado como username)
             password (str): Senha do estudante
+            defer_parsing (bool): Não extrai as datas de vencimento durante o
+                crawl; a página de cada atividade é anexada (compactada) à
+                atividade na chave 'page' para ser analisada depois
+            deadline (Optional[float]): Instante (time.monotonic) a partir do
+                qual o crawl das disciplinas é interrompido
+            progress (Optional[Callable]): Chamado com a fase e os contadores
+                do crawl (login, disciplinas concluídas, atividades encontradas)
         """
         self.username = ra
         self.password = password
+        self.defer_parsing = defer_parsing
+        self.deadline = deadline
+        self.progress = progress
+        self.request_timeout = settings.SCRAPING_REQUEST_TIMEOUT
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
+        # Contador de requisições HTTP feitas ao portal (inclui redirecionamentos)
+        self.request_count = 0
+        self.session.hooks['response'].append(self._count_request)
+
+    def _count_request(self, response, *args, **kwargs):
+        """
+        Hook de resposta da sessão que contabiliza as requisições
+        """
+        self.request_count += 1
+
     def login(self) -> bool:
         """
         Realiza login no sistema Moodle da UNAERP
@@ -46,7 +99,7 @@ class UnaerpScraper:
             logger.info(f"Iniciando processo de login para usuário: {self.username}")
 
             # Primeira requisição para obter o logintoken
-            response = self.session.get(self.LOGIN_URL)
+            response = self.session.get(self.LOGIN_URL, timeout=self.request_timeout)
             response.raise_for_status()
 
             logger.info(f"Página de login acessada. Status: {response.status_code}")
@@ -78,7 +131,7 @@ class UnaerpScraper:
             logger.info(f"Dados de login preparados para usuário: {self.username}")
 
             # Realizar login
-            response = self.session.post(self.LOGIN_URL, data=login_data)
+            response = self.session.post(self.LOGIN_URL, data=login_data, timeout=self.request_timeout)
             response.raise_for_status()
 
             logger.info(f"POST de login realizado. Status: {response.status_code}")
@@ -124,7 +177,7 @@ class UnaerpScraper:
             List[Dict]: Lista de disciplinas com informações
         """
         try:
-            response = self.session.get(self.DASHBOARD_URL)
+            response = self.session.get(self.DASHBOARD_URL, timeout=self.request_timeout)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -196,13 +249,13 @@ class UnaerpScraper:
         Returns:
             List[Dict]: Lista de atividades com informações
         """
+        assignments = []
         try:
             logger.info(f"Buscando atividades na URL: {course_url}")
-            response = self.session.get(course_url)
+            response = self.session.get(course_url, timeout=self.request_timeout)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
-            assignments = []
 
             # Log da estrutura da página para debug
             logger.info(f"Título da página: {soup.title.string if soup.title else 'N/A'}")
@@ -221,6 +274,8 @@ class UnaerpScraper:
             # 2. Extrair informações das unidades dos tooltips
             for tile in unit_tiles:
                 try:
+                    self._check_budget()
+
                     # Extrair número da seção
                     section_num = tile.get('data-section')
                     if not section_num or section_num == '0':  # Pular seção 0 (cabeçalho)
@@ -254,6 +309,8 @@ class UnaerpScraper:
                         else:
                             logger.debug(f"Unidade {section_num} ({unit_name}) não contém atividades avaliativas")
 
+                except SyncBudgetExceeded:
+                    raise
                 except Exception as e:
                     logger.error(f"Erro ao processar tile da unidade: {e}")
                     continue
@@ -272,6 +329,10 @@ class UnaerpScraper:
         except requests.RequestException as e:
             logger.error(f"Erro ao buscar atividades: {str(e)}")
             return []
+        except SyncBudgetExceeded as e:
+            # Mantém as atividades das unidades já processadas
+            e.assignments = assignments + e.assignments
+            raise
         except Exception as e:
             logger.error(f"Erro inesperado ao buscar atividades: {str(e)}")
             return []
@@ -288,9 +349,10 @@ class UnaerpScraper:
         Returns:
             List[Dict]: Lista de atividades da seção
         """
+        assignments = []
         try:
             logger.debug(f"Acessando seção: {section_url}")
-            response = self.session.get(section_url)
+            response = self.session.get(section_url, timeout=self.request_timeout)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -376,13 +438,15 @@ class UnaerpScraper:
                         }
 
                         # Extrair data de vencimento acessando a página da atividade
-                        due_date = self._extract_due_date_from_activity(activity_url)
+                        due_date = self._resolve_due_date(assignment, activity_url)
                         if due_date:
                             assignment['due_date'] = due_date
 
                         assignments.append(assignment)
                         logger.info(f"Atividade encontrada na {unit_name}: {title} ({activity_type}) - Prazo: {due_date or 'Não definido'}")
 
+                    except SyncBudgetExceeded:
+                        raise
                     except Exception as e:
                         logger.debug(f"Erro ao processar elemento de atividade: {e}")
                         continue
@@ -435,18 +499,23 @@ class UnaerpScraper:
                                 }
 
                                 # Extrair data de vencimento acessando a página da atividade
-                                due_date = self._extract_due_date_from_activity(href)
+                                due_date = self._resolve_due_date(assignment, href)
                                 if due_date:
                                     assignment['due_date'] = due_date
 
                                 assignments.append(assignment)
                                 logger.info(f"Atividade encontrada (busca ampla) na {unit_name}: {title} ({activity_type}) - Prazo: {due_date or 'Não definido'}")
+                    except SyncBudgetExceeded:
+                        raise
                     except Exception as e:
                         logger.debug(f"Erro na busca ampla: {e}")
                         continue
 
             return assignments
 
+        except SyncBudgetExceeded as e:
+            e.assignments = assignments + e.assignments
+            raise
         except Exception as e:
             logger.error(f"Erro ao extrair atividades da seção {section_num}: {e}")
             return []
@@ -499,6 +568,44 @@ class UnaerpScraper:
 
         return "Atividade sem nome"
 
+    def _check_budget(self):
+        """
+        Interrompe o crawl quando o tempo disponível para a sincronização se esgota
+
+        Raises:
+            SyncBudgetExceeded: Se o deadline foi atingido
+        """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SyncBudgetExceeded()
+
+    def _resolve_due_date(self, assignment: Dict, activity_url: str) -> Optional[date]:
+        """
+        Obtém a data de vencimento de uma atividade
+
+        Com defer_parsing, apenas baixa a página da atividade e a anexa
+        compactada em assignment['page'], retornando None.
+
+        Args:
+            assignment (Dict): Atividade em construção
+            activity_url (str): URL da atividade
+
+        Returns:
+            Optional[date]: Data de vencimento, se extraída agora
+        """
+        self._check_budget()
+
+        if not self.defer_parsing:
+            return self._extract_due_date_from_activity(activity_url)
+
+        try:
+            response = self.session.get(activity_url, timeout=self.request_timeout)
+            response.raise_for_status()
+            assignment['page'] = compress_page(response.content)
+        except requests.RequestException as e:
+            logger.error(f"Erro ao acessar atividade {activity_url}: {e}")
+
+        return None
+
     def _extract_due_date_from_activity(self, activity_url: str) -> Optional[date]:
         """
         Extrai a data de vencimento acessando a página específica da atividade
@@ -512,134 +619,148 @@ class UnaerpScraper:
         try:
             logger.debug(f"Extraindo data de vencimento de: {activity_url}")
 
-            response = self.session.get(activity_url)
+            response = self.session.get(activity_url, timeout=self.request_timeout)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return self.extract_due_date_from_page(response.content, activity_url)
 
-            # ESTRATÉGIA ESPECÍFICA PARA QUESTIONÁRIOS"
-            if 'mod/quiz' in activity_url:
-
-                # Buscar em divs com classe "box quizinfo"
-                quiz_info_boxes = soup.find_all('div', class_='box quizinfo')
-                for box in quiz_info_boxes:
-                    box_text = box.get_text()
-
-                    # Procurar por parágrafo que contém "será fechado em"
-                    close_paragraphs = box.find_all('p', string=lambda text: text and 'será fechado em' in text)
-                    for p in close_paragraphs:
-                        date_text = p.get_text(strip=True)
-
-                        # Extrair apenas a parte da data (após "será fechado em")
-                        if 'será fechado em' in date_text:
-                            date_part = date_text.split('será fechado em')[-1].strip()
-                            logger.debug(f"Parte da data extraída: {date_part}")
-
-                            parsed_date = self._parse_due_date(date_part)
-                            if parsed_date:
-                                logger.info(f"Data de fechamento do questionário extraída: {parsed_date}")
-                                return parsed_date
-
-                # Buscar também em texto geral para questionários
-                quiz_close_text = soup.find(string=re.compile(r'será fechado em', re.IGNORECASE))
-                if quiz_close_text:
-                    full_text = quiz_close_text.strip()
-
-                    if 'será fechado em' in full_text:
-                        date_part = full_text.split('será fechado em')[-1].strip()
-                        parsed_date = self._parse_due_date(date_part)
-                        if parsed_date:
-                            logger.info(f"Data de fechamento do questionário extraída: {parsed_date}")
-                            return parsed_date
+        except requests.RequestException as e:
+            logger.error(f"Erro ao acessar atividade {activity_url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Erro inesperado ao extrair data da atividade {activity_url}: {e}")
+            return None
 
-            # ESTRATÉGIA PRINCIPAL: Buscar na tabela por "Data de entrega" (para tarefas)
-            # Procurar por todas as células da tabela que contenham "Data de entrega"
-            table_cells = soup.find_all('td', string=lambda text: text and 'Data de entrega' in text)
+    @classmethod
+    def extract_due_date_from_page(cls, content, activity_url: str) -> Optional[date]:
+        """
+        Extrai a data de vencimento do HTML da página de uma atividade
 
-            for cell in table_cells:
-                logger.debug(f"Encontrada célula 'Data de entrega': {cell.get_text(strip=True)}")
+        Args:
+            content: HTML da página da atividade
+            activity_url (str): URL da atividade
 
-                # Buscar a célula seguinte (mesmo tr, próxima td)
-                next_cell = cell.find_next_sibling('td')
-                if next_cell:
-                    date_text = next_cell.get_text(strip=True)
-                    logger.debug(f"Data encontrada na célula seguinte: {date_text}")
+        Returns:
+            Optional[date]: Data de vencimento extraída da tabela de informações da atividade ou seção de questionário
+        """
+        soup = BeautifulSoup(content, 'html.parser')
 
-                    # Tentar extrair a data do texto
-                    parsed_date = self._parse_due_date(date_text)
-                    if parsed_date:
-                        logger.info(f"Data de entrega extraída com sucesso: {parsed_date}")
-                        return parsed_date
+        # ESTRATÉGIA ESPECÍFICA PARA QUESTIONÁRIOS"
+        if 'mod/quiz' in activity_url:
 
-            # ESTRATÉGIA ALTERNATIVA 1: Buscar em qualquer tr que contenha "Data de entrega"
-            table_rows = soup.find_all('tr')
-            for row in table_rows:
-                row_text = row.get_text()
-                if 'Data de entrega' in row_text:
-                    logger.debug(f"Linha com 'Data de entrega' encontrada: {row_text}")
-
-                    # Buscar todas as células da linha
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        # Procurar a célula que contém a data (normalmente a segunda)
-                        for i, cell in enumerate(cells):
-                            if 'Data de entrega' in cell.get_text():
-                                # A data deve estar na próxima célula
-                                if i + 1 < len(cells):
-                                    date_text = cells[i + 1].get_text(strip=True)
-                                    logger.debug(f"Data encontrada na linha: {date_text}")
-
-                                    parsed_date = self._parse_due_date(date_text)
-                                    if parsed_date:
-                                        logger.info(f"Data de entrega extraída da linha: {parsed_date}")
-                                        return parsed_date
-
-            # ESTRATÉGIA ALTERNATIVA 2: Buscar por seção "Status de envio" (método anterior como fallback)
-            status_section = soup.find('h3', string=lambda text: text and 'Status de envio' in text)
-            if status_section:
-                status_container = status_section.find_next('div')
-                if status_container:
-                    status_text = status_container.get_text()
-                    logger.debug(f"Status de envio encontrado: {status_text}")
-
-                    parsed_date = self._parse_due_date(status_text)
-                    if parsed_date:
-                        logger.info(f"Data extraída do status de envio: {parsed_date}")
-                        return parsed_date
+            # Buscar em divs com classe "box quizinfo"
+            quiz_info_boxes = soup.find_all('div', class_='box quizinfo')
+            for box in quiz_info_boxes:
+                box_text = box.get_text()
 
-            # ESTRATÉGIA ALTERNATIVA 3: Buscar por qualquer texto que contenha padrões de data
-            submission_info = soup.find(string=re.compile(r'aceitará envios|prazo|até|vencimento|entrega', re.IGNORECASE))
-            if submission_info:
-                parent = submission_info.parent
-                if parent:
-                    text = parent.get_text()
-                    logger.debug(f"Informação de envio encontrada: {text}")
+                # Procurar por parágrafo que contém "será fechado em"
+                close_paragraphs = box.find_all('p', string=lambda text: text and 'será fechado em' in text)
+                for p in close_paragraphs:
+                    date_text = p.get_text(strip=True)
 
-                    parsed_date = self._parse_due_date(text)
-                    if parsed_date:
-                        logger.info(f"Data extraída de informação de envio: {parsed_date}")
-                        return parsed_date
+                    # Extrair apenas a parte da data (após "será fechado em")
+                    if 'será fechado em' in date_text:
+                        date_part = date_text.split('será fechado em')[-1].strip()
+                        logger.debug(f"Parte da data extraída: {date_part}")
+
+                        parsed_date = cls._parse_due_date(date_part)
+                        if parsed_date:
+                            logger.info(f"Data de fechamento do questionário extraída: {parsed_date}")
+                            return parsed_date
 
-            # ESTRATÉGIA ALTERNATIVA 4: Buscar em todas as tabelas
-            tables = soup.find_all('table')
-            for table in tables:
-                table_text = table.get_text()
-                if any(keyword in table_text.lower() for keyword in ['prazo', 'vencimento', 'até', 'entrega', 'data']):
-                    logger.debug(f"Tabela com informação de data encontrada")
-                    parsed_date = self._parse_due_date(table_text)
+            # Buscar também em texto geral para questionários
+            quiz_close_text = soup.find(string=re.compile(r'será fechado em', re.IGNORECASE))
+            if quiz_close_text:
+                full_text = quiz_close_text.strip()
+
+                if 'será fechado em' in full_text:
+                    date_part = full_text.split('será fechado em')[-1].strip()
+                    parsed_date = cls._parse_due_date(date_part)
                     if parsed_date:
-                        logger.info(f"Data extraída de tabela: {parsed_date}")
+                        logger.info(f"Data de fechamento do questionário extraída: {parsed_date}")
                         return parsed_date
 
-            logger.debug(f"Nenhuma data de vencimento encontrada para: {activity_url}")
-            return None
-
-        except requests.RequestException as e:
-            logger.error(f"Erro ao acessar atividade {activity_url}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Erro inesperado ao extrair data da atividade {activity_url}: {e}")
-            return None
+        # ESTRATÉGIA PRINCIPAL: Buscar na tabela por "Data de entrega" (para tarefas)
+        # Procurar por todas as células da tabela que contenham "Data de entrega"
+        table_cells = soup.find_all('td', string=lambda text: text and 'Data de entrega' in text)
+
+        for cell in table_cells:
+            logger.debug(f"Encontrada célula 'Data de entrega': {cell.get_text(strip=True)}")
+
+            # Buscar a célula seguinte (mesmo tr, próxima td)
+            next_cell = cell.find_next_sibling('td')
+            if next_cell:
+                date_text = next_cell.get_text(strip=True)
+                logger.debug(f"Data encontrada na célula seguinte: {date_text}")
+
+                # Tentar extrair a data do texto
+                parsed_date = cls._parse_due_date(date_text)
+                if parsed_date:
+                    logger.info(f"Data de entrega extraída com sucesso: {parsed_date}")
+                    return parsed_date
+
+        # ESTRATÉGIA ALTERNATIVA 1: Buscar em qualquer tr que contenha "Data de entrega"
+        table_rows = soup.find_all('tr')
+        for row in table_rows:
+            row_text = row.get_text()
+            if 'Data de entrega' in row_text:
+                logger.debug(f"Linha com 'Data de entrega' encontrada: {row_text}")
+
+                # Buscar todas as células da linha
+                cells = row.find_all('td')
+                if len(cells) >= 2:
+                    # Procurar a célula que contém a data (normalmente a segunda)
+                    for i, cell in enumerate(cells):
+                        if 'Data de entrega' in cell.get_text():
+                            # A data deve estar na próxima célula
+                            if i + 1 < len(cells):
+                                date_text = cells[i + 1].get_text(strip=True)
+                                logger.debug(f"Data encontrada na linha: {date_text}")
+
+                                parsed_date = cls._parse_due_date(date_text)
+                                if parsed_date:
+                                    logger.info(f"Data de entrega extraída da linha: {parsed_date}")
+                                    return parsed_date
+
+        # ESTRATÉGIA ALTERNATIVA 2: Buscar por seção "Status de envio" (método anterior como fallback)
+        status_section = soup.find('h3', string=lambda text: text and 'Status de envio' in text)
+        if status_section:
+            status_container = status_section.find_next('div')
+            if status_container:
+                status_text = status_container.get_text()
+                logger.debug(f"Status de envio encontrado: {status_text}")
+
+                parsed_date = cls._parse_due_date(status_text)
+                if parsed_date:
+                    logger.info(f"Data extraída do status de envio: {parsed_date}")
+                    return parsed_date
+
+        # ESTRATÉGIA ALTERNATIVA 3: Buscar por qualquer texto que contenha padrões de data
+        submission_info = soup.find(string=re.compile(r'aceitará envios|prazo|até|vencimento|entrega', re.IGNORECASE))
+        if submission_info:
+            parent = submission_info.parent
+            if parent:
+                text = parent.get_text()
+                logger.debug(f"Informação de envio encontrada: {text}")
+
+                parsed_date = cls._parse_due_date(text)
+                if parsed_date:
+                    logger.info(f"Data extraída de informação de envio: {parsed_date}")
+                    return parsed_date
+
+        # ESTRATÉGIA ALTERNATIVA 4: Buscar em todas as tabelas
+        tables = soup.find_all('table')
+        for table in tables:
+            table_text = table.get_text()
+            if any(keyword in table_text.lower() for keyword in ['prazo', 'vencimento', 'até', 'entrega', 'data']):
+                logger.debug(f"Tabela com informação de data encontrada")
+                parsed_date = cls._parse_due_date(table_text)
+                if parsed_date:
+                    logger.info(f"Data extraída de tabela: {parsed_date}")
+                    return parsed_date
+
+        logger.debug(f"Nenhuma data de vencimento encontrada para: {activity_url}")
+        return None
 
     def _extract_assignments_from_main_page(self, soup, course_url: str) -> List[Dict]:
         """
@@ -699,7 +820,7 @@ class UnaerpScraper:
                     }
 
                     # Extrair data de vencimento acessando a página da atividade
-                    due_date = self._extract_due_date_from_activity(href)
+                    due_date = self._resolve_due_date(assignment_data, href)
                     if due_date:
                         assignment_data['due_date'] = due_date
 
@@ -708,13 +829,17 @@ class UnaerpScraper:
                         assignments.append(assignment_data)
                         logger.info(f"Atividade encontrada (página principal): {title} ({activity_type}) - Prazo: {due_date or 'Não definido'}")
 
+            except SyncBudgetExceeded as e:
+                e.assignments = assignments + e.assignments
+                raise
             except Exception as e:
                 logger.debug(f"Erro ao processar link na busca principal: {str(e)}")
                 continue
 
         return assignments
 
-    def _parse_due_date(self, date_text: str) -> Optional[date]:
+    @staticmethod
+    def _parse_due_date(date_text: str) -> Optional[date]:
         """
         Converte texto de data em objeto date
 
@@ -809,49 +934,107 @@ class UnaerpScraper:
         logger.debug(f"Não foi possível converter a data: {date_text}")
         return None
 
-    def scrape_all_data(self) -> Dict:
+    def scrape_all_data(self, priority_links: Optional[List[str]] = None) -> Dict:
         """
         Executa scraping completo de disciplinas e atividades
 
+        Se o deadline for atingido, o crawl para e os links das disciplinas
+        restantes ficam em 'pending_courses'. A disciplina interrompida é
+        retornada com as atividades já extraídas e vai para o fim da fila, para
+        não bloquear as seguintes na próxima execução. A primeira disciplina é
+        sempre concluída, então cada execução avança pelo menos uma.
+
+        Args:
+            priority_links (Optional[List[str]]): Links de disciplinas pendentes
+                de uma execução anterior, processadas primeiro e nessa ordem
+
         Returns:
             Dict: Dados completos extraídos
         """
         result = {
             'success': False,
             'courses': [],
+            'pending_courses': [],
+            'partial': False,
             'assignments_count': 0,
             'error': None
         }
+        deadline = self.deadline
 
         try:
             # Fazer login
+            self._report_progress('login')
             if not self.login():
                 result['error'] = 'Falha no login'
                 return result
 
-            # Buscar disciplinas
+            # Buscar disciplinas (pendentes da execução anterior primeiro)
             courses = self.get_courses()
+            if priority_links:
+                order = {link: position for position, link in enumerate(priority_links)}
+                courses.sort(key=lambda course: order.get(course.get('link'), len(order)))
+
+            finished_courses = []
+            self._report_progress('fetch', courses_done=0, courses_total=len(courses), assignments_found=0)
 
             # Para cada disciplina, buscar atividades
-            for course in courses:
+            for index, course in enumerate(courses):
                 if course.get('link'):
-                    assignments = self.get_assignments(course['link'])
+                    # Sem deadline até a primeira disciplina terminar
+                    self.deadline = deadline if finished_courses else None
+                    try:
+                        assignments = self.get_assignments(course['link'])
+                    except SyncBudgetExceeded as e:
+                        # A disciplina interrompida vai para o fim da fila
+                        result['pending_courses'] = [c['link'] for c in courses[index + 1:] if c.get('link')]
+                        result['pending_courses'].append(course['link'])
+                        result['partial'] = True
+                        logger.warning(f"Tempo de sincronização esgotado: {len(result['pending_courses'])} disciplinas pendentes")
+
+                        if e.assignments:
+                            course['assignments'] = e.assignments
+                            result['assignments_count'] += len(e.assignments)
+                            finished_courses.append(course)
+                        break
                     course['assignments'] = assignments
                     result['assignments_count'] += len(assignments)
                 else:
                     course['assignments'] = []
 
-            result['courses'] = courses
+                finished_courses.append(course)
+                self._report_progress(
+                    'fetch',
+                    courses_done=len(finished_courses),
+                    courses_total=len(courses),
+                    assignments_found=result['assignments_count'],
+                    current_course=course.get('name', ''),
+                )
+
+            result['courses'] = finished_courses
             result['success'] = True
 
-            logger.info(f"Scraping concluído: {len(courses)} disciplinas, {result['assignments_count']} atividades")
+            logger.info(f"Scraping concluído: {len(finished_courses)} disciplinas, {result['assignments_count']} atividades")
 
         except Exception as e:
             logger.error(f"Erro no scraping completo: {str(e)}")
             result['error'] = str(e)
+        finally:
+            self.deadline = deadline
 
         return result
 
+    def _report_progress(self, phase: str, **data):
+        """
+        Repassa o progresso do crawl ao callback, sem deixar erros interromperem o scraping
+        """
+        if self.progress is None:
+            return
+
+        try:
+            self.progress(phase, **data)
+        except Exception as e:
+            logger.warning(f"Erro ao reportar progresso: {str(e)}")
+
     def close(self):
         """
         Fecha a sessão
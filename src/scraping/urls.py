@@ -8,4 +8,5 @@ urlpatterns = [
     path('credentials/', views.credentials_view, name='credentials'),
     path('start/', views.start_scraping_view, name='start_scraping'),
     path('task/<str:task_id>/', views.check_task_status, name='task_status'),
+    path('task/<str:task_id>/progress/', views.sync_progress_stream, name='task_progress'),
 ]
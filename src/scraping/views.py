@@ -1,12 +1,15 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from user.models import UnaerpCredentials
 from celery.result import AsyncResult
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @login_required
@@ -65,21 +68,28 @@ def start_scraping_view(request):
                 'error': 'Credenciais UNAERP não configuradas'
             })
 
-        print(f"Iniciando scraping para usuário: {request.user.email}")
+        logger.info(f"Iniciando scraping para usuário: {request.user.email}")
 
-        from scraping.tasks import scrape_user_data
-        task = scrape_user_data.delay(request.user.id)
+        from scraping.locks import request_user_sync
+        result = request_user_sync(request.user.id, interactive=True)
 
-        print(f"Task criada com ID: {task.id}")
+        if not result['success']:
+            return JsonResponse({
+                'success': False,
+                'error': result['error'],
+                'retry_after': result['retry_after'],
+            })
+
+        logger.info(f"Task {'existente' if result['coalesced'] else 'criada'} com ID: {result['task_id']}")
 
         return JsonResponse({
             'success': True,
-            'task_id': task.id,
-            'message': 'Scraping iniciado com sucesso!'
+            'task_id': result['task_id'],
+            'message': 'Sincronização já em andamento' if result['coalesced'] else 'Scraping iniciado com sucesso!'
         })
 
     except Exception as e:
-        print(f"Erro no start_scraping_view: {str(e)}")
+        logger.error(f"Erro no start_scraping_view: {str(e)}")
         return JsonResponse({
             'success': False,
             'error': str(e)
@@ -114,6 +124,36 @@ def check_task_status(request, task_id):
         })
 
 
+async def sync_progress_stream(request, task_id):
+    """
+    Stream SSE (text/event-stream) com o progresso de uma sincronização
+
+    Substitui o polling de check_task_status: cada etapa do pipeline publica
+    seus eventos no Redis e eles são repassados ao navegador assim que chegam.
+    Deve ser servida pelo ASGI (config.asgi), onde cada conexão aberta não
+    ocupa uma thread.
+    """
+    from scraping.models import SyncRun
+    from scraping.progress import progress_events
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'success': False, 'error': 'Não autenticado'}, status=401)
+
+    if not await SyncRun.objects.filter(task_id=task_id, user_id=user.id).aexists():
+        return JsonResponse({'success': False, 'error': 'Sincronização não encontrada'}, status=404)
+
+    async def event_stream():
+        yield 'retry: 3000\n\n'
+        async for event in progress_events(task_id):
+            yield f'data: {event}\n\n' if event else ': keepalive\n\n'
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def test_sync_view(request):
     """
@@ -134,18 +174,19 @@ def scraping_dashboard(request):
         credentials = None
         has_credentials = False
 
-    from core.models import Course, Assignment
+    from core.cache import cached_stats
+    from core.stats import dashboard_stats
+    from scraping.models import SyncRun
 
-    total_courses = Course.objects.filter(user=request.user).count()
-    total_assignments = Assignment.objects.filter(user=request.user).count()
-    pending_assignments = Assignment.objects.filter(user=request.user, completed=False).count()
+    stats = cached_stats('dashboard', request.user.id, lambda: dashboard_stats(request.user))
 
     context = {
         'has_credentials': has_credentials,
         'credentials': credentials,
-        'total_courses': total_courses,
-        'total_assignments': total_assignments,
-        'pending_assignments': pending_assignments,
+        'total_courses': stats['total_courses'],
+        'total_assignments': stats['total_assignments'],
+        'pending_assignments': stats['pending_assignments'],
+        'sync_runs': SyncRun.objects.filter(user=request.user)[:10],
     }
 
     return render(request, 'scraping/dashboard.html', context)
@@ -24,7 +24,7 @@ class CustomUserAdmin(UserAdmin):
             'description': 'Credenciais para acesso ao portal da UNAERP'
         }),
         ('Preferências', {
-            'fields': ('dias_antecedencia_alerta', 'receber_emails')
+            'fields': ('dias_antecedencia_alerta', 'receber_emails', 'horario_preferido_alerta')
         }),
         ('Permissões', {
             'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions'),
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_remove_unaerpcredentials_password_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unaerpcredentials',
+            name='pending_courses',
+            field=models.JSONField(blank=True, default=list, verbose_name='Disciplinas Pendentes'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_unaerpcredentials_pending_courses'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='horario_preferido_alerta',
+            field=models.TimeField(blank=True, null=True, verbose_name='Horário preferido para alerta'),
+        ),
+    ]
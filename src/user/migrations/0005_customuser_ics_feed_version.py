@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_customuser_horario_preferido_alerta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='ics_feed_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Versão do link do calendário'),
+        ),
+    ]
@@ -13,6 +13,8 @@ class CustomUser(AbstractUser):
 
     dias_antecedencia_alerta = models.IntegerField(default=2, verbose_name='Dias de antecedência para alerta')
     receber_emails = models.BooleanField(default=True, verbose_name='Receber e-mails')
+    horario_preferido_alerta = models.TimeField(null=True, blank=True, verbose_name='Horário preferido para alerta')
+    ics_feed_version = models.PositiveIntegerField(default=0, verbose_name='Versão do link do calendário')
 
     USERNAME_FIELD = 'email'  # Login será feito com e-mail
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
@@ -8,6 +8,7 @@ class UnaerpCredentials(models.Model):
     ra = models.CharField(max_length=100, verbose_name='RA')
     encrypted_password = models.TextField(verbose_name='Senha Criptografada', default='')
     last_sync = models.DateTimeField(null=True, blank=True, verbose_name='Última Sincronização')
+    pending_courses = models.JSONField(default=list, blank=True, verbose_name='Disciplinas Pendentes')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
 
@@ -6,6 +6,9 @@ urlpatterns = [
     path('courses/', views.courses_view, name='courses'),
     path('assignments/', views.assignments_view, name='assignments'),
     path('assignments/<int:assignment_id>/toggle/', views.toggle_assignment_completion, name='toggle_assignment'),
+    path('assignments/complete/', views.complete_assignments_bulk, name='complete_assignments'),
+    path('assignments/search/', views.search_view, name='search_assignments'),
+    path('calendar/', views.calendar_view, name='calendar'),
     path('settings/', views.account_settings_view, name='account_settings'),
     path('login/', views.login_view, name='login'),
     path('register/', views.register_view, name='register'),
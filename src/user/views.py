@@ -1,37 +1,42 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_protect
+from django.http import Http404, JsonResponse
 from django.utils import timezone
-from django.http import JsonResponse
-from datetime import timedelta
+from django.utils.functional import SimpleLazyObject
+from datetime import time
+import json
 from .models import CustomUser
 from core.models import Course, Assignment
+from core.agenda import adjacent_anchors, cached_day_buckets, parse_calendar_params
+from core.cache import bump_data_version, cached_stats, fragment_cache_context
+from core.completion import complete_assignments, toggle_completion
+from core.export import ics_token, rotate_ics_token
+from core.pagination import paginate_by_due_date, paginate_by_id
+from core.search import parse_search_filters, search_assignments
+from core.stats import assignment_stats, courses_with_counts, dashboard_stats
+from notifications.alerts import ALERT_SWEEP_TIME
+
+# Atividades por página em cada lista de assignments_view
+ASSIGNMENTS_PAGE_SIZE = 50
 
 
 @login_required
 def dashboard_view(request):
-    courses = Course.objects.filter(user=request.user)
-    assignments = Assignment.objects.filter(course__user=request.user)
-
-    total_courses = courses.count()
-    total_assignments = assignments.count()
-
-    next_week = timezone.now() + timedelta(days=7)
-    upcoming_assignments = assignments.filter(
-        due_date__isnull=False,
-        due_date__lte=next_week,
-        due_date__gte=timezone.now(),
-        completed=False
-    ).count()
+    # Totais em uma consulta e disciplinas já com as contagens de atividades
+    stats = cached_stats('dashboard', request.user.id, lambda: dashboard_stats(request.user))
 
     context = {
         'user': request.user,
-        'total_courses': total_courses,
-        'total_assignments': total_assignments,
-        'upcoming_assignments': upcoming_assignments,
-        'courses': courses[:5],  # Limitado a 5 para o dashboard
+        'total_courses': stats['total_courses'],
+        'total_assignments': stats['total_assignments'],
+        'upcoming_assignments': stats['upcoming_assignments'],
+        # Consulta preguiçosa: não roda quando o bloco da lista está em cache
+        'courses': courses_with_counts(request.user)[:5],  # Limitado a 5 para o dashboard
+        **fragment_cache_context(request.user.id),
     }
     return render(request, 'user/dashboard.html', context)
 
@@ -39,43 +44,138 @@ def dashboard_view(request):
 @login_required
 def courses_view(request):
     """Lista todas as disciplinas do usuário"""
-    courses = Course.objects.filter(user=request.user).prefetch_related('assignment_set')
-
     context = {
-        'courses': courses,
-        'total_courses': courses.count(),
+        # Consulta preguiçosa: não roda quando o bloco da lista está em cache
+        'courses': courses_with_counts(request.user),
+        **fragment_cache_context(request.user.id),
     }
     return render(request, 'user/courses.html', context)
 
 
 @login_required
 def assignments_view(request):
-    """Lista todas as atividades do usuário"""
-    assignments = Assignment.objects.filter(course__user=request.user).select_related('course').order_by('-due_date', 'title')
+    """Lista as atividades do usuário, paginadas por keyset"""
+    assignments = Assignment.objects.filter(user=request.user).select_related('course')
 
     # Filtros
-    course_filter = request.GET.get('course')
-    if course_filter:
-        assignments = assignments.filter(course__id=course_filter)
+    course_filter = request.GET.get('course', '')
+    course_id = int(course_filter) if course_filter.isdigit() else None
+    if course_id:
+        assignments = assignments.filter(course_id=course_id)
+
+    # Todas as contagens em uma única consulta
+    stats = cached_stats(
+        f'assignments:{course_id or "all"}',
+        request.user.id,
+        lambda: assignment_stats(request.user, course_id=course_id),
+    )
+
+    # Páginas calculadas só quando o template as usa, ou seja, quando o bloco
+    # da lista não está em cache
+    with_due_page = SimpleLazyObject(lambda: _assignments_page(
+        request, 'after', paginate_by_due_date, assignments.filter(due_date__isnull=False),
+    ))
+    without_due_page = SimpleLazyObject(lambda: _assignments_page(
+        request, 'after_no_due', paginate_by_id, assignments.filter(due_date__isnull=True),
+    ))
+
+    context = {
+        'with_due_page': with_due_page,
+        'without_due_page': without_due_page,
+        'after': request.GET.get('after', ''),
+        'after_no_due': request.GET.get('after_no_due', ''),
+        'is_first_page': not (request.GET.get('after') or request.GET.get('after_no_due')),
+        'first_page_query': _page_query(request, None, None),
+        'stats': stats,
+        'total_assignments': stats['total'],
+        'overdue_count': stats['overdue'],
+        'upcoming_count': stats['upcoming'],
+        'courses': Course.objects.filter(user=request.user).only('id', 'name').order_by('name'),
+        'selected_course': str(course_id) if course_id else '',
+        **fragment_cache_context(request.user.id),
+    }
+    return render(request, 'user/assignments.html', context)
+
 
-    assignments_with_due = assignments.filter(due_date__isnull=False)
-    assignments_without_due = assignments.filter(due_date__isnull=True)
+@login_required
+def calendar_view(request):
+    """Calendário mensal ou semanal com as atividades de cada dia"""
+    params = parse_calendar_params(request.GET)
+    days = cached_day_buckets(request.user, params['start'], params['end'])
+    previous_anchor, next_anchor = adjacent_anchors(params['view'], params['anchor'])
 
-    now = timezone.now().date()
-    overdue = assignments_with_due.filter(due_date__lt=now, completed=False).count()
-    upcoming = assignments_with_due.filter(due_date__gte=now, due_date__lte=now + timedelta(days=7), completed=False).count()
+    context = {
+        'view': params['view'],
+        'anchor': params['anchor'],
+        'weeks': [days[i:i + 7] for i in range(0, len(days), 7)],
+        'previous_anchor': previous_anchor,
+        'next_anchor': next_anchor,
+        'today': timezone.localdate(),
+    }
+    return render(request, 'user/calendar.html', context)
+
+
+@login_required
+def search_view(request):
+    """Busca de atividades por título ou disciplina, tolerante a acentos e erros de digitação"""
+    query = request.GET.get('q', '').strip()
+    filters = parse_search_filters(request.GET)
 
     context = {
+        'query': query,
+        'results': search_assignments(request.user, query, **filters) if query else [],
+        'courses': Course.objects.filter(user=request.user).only('id', 'name').order_by('name'),
+        'selected_course': str(filters['course_id']) if filters['course_id'] else '',
+        'due_from': filters['due_from'],
+        'due_to': filters['due_to'],
+    }
+    return render(request, 'user/search.html', context)
+
+
+def _assignments_page(request, param, paginate, queryset):
+    """
+    Página de uma das listas de assignments_view
+
+    Args:
+        request (HttpRequest): Requisição atual
+        param (str): Parâmetro do cursor da lista ('after' ou 'after_no_due')
+        paginate (callable): paginate_by_due_date ou paginate_by_id
+        queryset (QuerySet): Atividades da lista
+
+    Returns:
+        Dict: {'assignments', 'next_page_query'}
+    """
+    assignments, next_cursor = paginate(queryset, cursor=request.GET.get(param), page_size=ASSIGNMENTS_PAGE_SIZE)
+    return {
         'assignments': assignments,
-        'assignments_with_due': assignments_with_due,
-        'assignments_without_due': assignments_without_due,
-        'total_assignments': assignments.count(),
-        'overdue_count': overdue,
-        'upcoming_count': upcoming,
-        'courses': Course.objects.filter(user=request.user),
-        'selected_course': course_filter,
+        'next_page_query': _page_query(request, param, next_cursor),
     }
-    return render(request, 'user/assignments.html', context)
+
+
+def _page_query(request, param, cursor):
+    """
+    Query string da próxima página de uma lista, mantendo filtros e o cursor da outra lista
+
+    Args:
+        request (HttpRequest): Requisição atual
+        param (str): Parâmetro do cursor ('after' ou 'after_no_due'); None volta ao início
+        cursor (str): Cursor da próxima página
+
+    Returns:
+        str: Query string, ou None se não há próxima página
+    """
+    query = request.GET.copy()
+
+    if param is None:
+        query.pop('after', None)
+        query.pop('after_no_due', None)
+        return query.urlencode()
+
+    if not cursor:
+        return None
+
+    query[param] = cursor
+    return query.urlencode()
 
 
 @login_required
@@ -88,6 +188,21 @@ def account_settings_view(request):
             request.user.last_name = request.POST.get('last_name', '')
             request.user.dias_antecedencia_alerta = int(request.POST.get('dias_antecedencia_alerta', 3))
             request.user.receber_emails = request.POST.get('receber_emails') == 'on'
+            try:
+                preferred_time = request.POST.get('horario_preferido_alerta', '')
+                preferred_time = time.fromisoformat(preferred_time) if preferred_time else None
+            except ValueError:
+                preferred_time = request.user.horario_preferido_alerta
+
+            # Os alertas do dia são preparados em ALERT_SWEEP_TIME; antes disso não há o que enviar
+            if preferred_time and preferred_time < ALERT_SWEEP_TIME:
+                messages.error(
+                    request,
+                    f'O horário preferido para alertas deve ser a partir de {ALERT_SWEEP_TIME:%H:%M}.',
+                )
+                return redirect('account_settings')
+
+            request.user.horario_preferido_alerta = preferred_time
             request.user.save()
             messages.success(request, 'Perfil atualizado com sucesso!')
 
@@ -112,10 +227,17 @@ def account_settings_view(request):
                     login(request, user)
                 messages.success(request, 'Senha alterada com sucesso!')
 
+        # Novo link do calendário: o anterior deixa de funcionar
+        elif 'regenerate_ics_link' in request.POST:
+            rotate_ics_token(request.user)
+            messages.success(request, 'Novo link do calendário gerado. Atualize a assinatura no seu aplicativo de calendário.')
+
         return redirect('account_settings')
 
     context = {
         'user': request.user,
+        'ics_feed_url': request.build_absolute_uri(reverse('api:calendar_feed', args=[ics_token(request.user)])),
+        'alert_sweep_time': ALERT_SWEEP_TIME,
     }
     return render(request, 'user/account_settings.html', context)
 @csrf_protect
@@ -189,13 +311,51 @@ def logout_view(request):
 def toggle_assignment_completion(request, assignment_id):
     """Toggle do status de conclusão de uma atividade"""
     if request.method == 'POST':
-        assignment = get_object_or_404(Assignment, id=assignment_id, course__user=request.user)
-        assignment.completed = not assignment.completed
-        assignment.save()
+        completed = toggle_completion(request.user.id, assignment_id)
+        if completed is None:
+            raise Http404('Atividade não encontrada')
+
+        bump_data_version(request.user.id)
 
         return JsonResponse({
             'success': True,
-            'completed': assignment.completed
+            'completed': completed
         })
 
     return JsonResponse({'success': False, 'error': 'Método não permitido'}, status=405)
+
+
+@login_required
+def complete_assignments_bulk(request):
+    """
+    Marca várias atividades (ou uma disciplina inteira) como concluídas
+
+    Corpo JSON: {"assignment_ids": [1, 2, 3]} ou {"course_id": 4}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método não permitido'}, status=405)
+
+    try:
+        payload = json.loads(request.body or '{}')
+        assignment_ids = payload.get('assignment_ids')
+        course_id = payload.get('course_id')
+
+        if assignment_ids is not None:
+            assignment_ids = [int(assignment_id) for assignment_id in assignment_ids]
+        if course_id is not None:
+            course_id = int(course_id)
+    except (AttributeError, TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Requisição inválida'}, status=400)
+
+    if assignment_ids is None and course_id is None:
+        return JsonResponse({'success': False, 'error': 'Informe assignment_ids ou course_id'}, status=400)
+
+    updated = complete_assignments(request.user.id, assignment_ids=assignment_ids, course_id=course_id)
+
+    if updated:
+        bump_data_version(request.user.id)
+
+    return JsonResponse({
+        'success': True,
+        'updated': updated
+    })